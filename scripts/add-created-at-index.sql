@@ -0,0 +1,7 @@
+-- One-off migration: add the covering created_at index used by
+-- list_session_plans to databases created before it was in init-db.sql.
+-- CONCURRENTLY avoids locking session_plans against writes, but cannot run
+-- inside a transaction, so run this file on its own, e.g.:
+--   psql "$DATABASE_URL" -f scripts/add-created-at-index.sql
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_plans_created_at ON session_plans(created_at DESC)
+    INCLUDE (id, title, category, difficulty, author, source_filename, extraction_timestamp);
@@ -47,6 +47,8 @@ CREATE TABLE IF NOT EXISTS tactical_contexts (
 
 CREATE INDEX IF NOT EXISTS idx_session_plans_title ON session_plans(title);
 CREATE INDEX IF NOT EXISTS idx_session_plans_category ON session_plans(category);
+CREATE INDEX IF NOT EXISTS idx_session_plans_created_at ON session_plans(created_at DESC)
+    INCLUDE (id, title, category, difficulty, author, source_filename, extraction_timestamp);
 CREATE INDEX IF NOT EXISTS idx_drill_blocks_session ON drill_blocks(session_plan_id);
 CREATE INDEX IF NOT EXISTS idx_tactical_contexts_drill ON tactical_contexts(drill_block_id);
 CREATE INDEX IF NOT EXISTS idx_tactical_contexts_methodology ON tactical_contexts(methodology);
@@ -20,6 +20,13 @@ class Settings(BaseSettings):
     vlm_max_tokens_pass1: int = 4096
     vlm_max_tokens_pass2: int = 8192
 
+    # Max images in flight to the VLM at once
+    vlm_max_concurrency: int = 8
+
+    # VLM result cache keyed by image content hash, on disk and in memory
+    # (empty = both disabled)
+    vlm_cache_dir: str = ""
+
     # ColPali visual retrieval (empty = disabled)
     colpali_url: str = ""
     colpali_timeout_seconds: int = 120
@@ -6,6 +6,9 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.pipeline.vlm_backend import aclose_http_client
+from src.rendering.pdf_report import shutdown_render_pool
+
 from .config import settings
 from .deps import engine
 from .routes import drills, ingest, search, sessions
@@ -31,6 +34,8 @@ async def lifespan(app: FastAPI):
     logger.info(f"Database: {db_host}")
     yield
     logger.info("Soccer Analytics Service shutting down")
+    await aclose_http_client()
+    shutdown_render_pool()
     await engine.dispose()
 
 
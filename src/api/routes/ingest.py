@@ -76,11 +76,17 @@ async def ingest_pdf(
             vlm_model=settings.vlm_model,
         )
 
+        vlm_cache_dir = (
+            Path(settings.vlm_cache_dir) if settings.vlm_cache_dir else None
+        )
+
         # Stage 2: Classify diagrams with VLM (Pass 1)
         classifications = await classify_diagrams(
             images=document.images,
             max_tokens=settings.vlm_max_tokens_pass1,
             vlm=vlm,
+            cache_dir=vlm_cache_dir,
+            max_concurrency=settings.vlm_max_concurrency,
         )
 
         # Stage 2b: Multi-pass structured extraction (CV + 4 focused VLM passes)
@@ -92,6 +98,8 @@ async def ingest_pdf(
                 classifications=classifications,
                 max_tokens_pass2=settings.vlm_max_tokens_pass2,
                 vlm=vlm,
+                cache_dir=vlm_cache_dir,
+                max_concurrency=settings.vlm_max_concurrency,
             )
             # Cross-validate each diagram (CV vs VLM conflict resolution)
             for key, data in structure_data.items():
@@ -22,6 +22,23 @@ class DecomposedDocument:
     tables: list[str] = field(default_factory=list)
 
 
+def _save_pictures(doc, output_dir: Path) -> dict[str, Path]:
+    """Write each picture element as an optimized PNG.
+
+    optimize=True is lossless but yields smaller files, which shrinks every
+    base64 upload of the image to the VLM in later stages.
+    """
+    images: dict[str, Path] = {}
+    for i, picture in enumerate(doc.pictures):
+        pil_image = picture.get_image(doc)
+        if pil_image is not None:
+            image_path = output_dir / f"diagram_{i:03d}.png"
+            pil_image.save(str(image_path), optimize=True)
+            images[f"diagram_{i:03d}"] = image_path
+            logger.info(f"Extracted image: {image_path}")
+    return images
+
+
 async def decompose_pdf(pdf_path: Path, output_dir: Path) -> DecomposedDocument:
     """Decompose a PDF into markdown text and extracted images.
 
@@ -60,15 +77,10 @@ async def decompose_pdf(pdf_path: Path, output_dir: Path) -> DecomposedDocument:
     # Export markdown
     markdown = doc.export_to_markdown()
 
-    # Extract images from picture elements
-    images: dict[str, Path] = {}
-    for i, picture in enumerate(doc.pictures):
-        pil_image = picture.get_image(doc)
-        if pil_image is not None:
-            image_path = output_dir / f"diagram_{i:03d}.png"
-            pil_image.save(str(image_path))
-            images[f"diagram_{i:03d}"] = image_path
-            logger.info(f"Extracted image: {image_path}")
+    # Extract images from picture elements (PNG encoding is CPU-bound)
+    images = await loop.run_in_executor(
+        None, lambda: _save_pictures(doc, output_dir)
+    )
 
     # Extract tables
     tables = []
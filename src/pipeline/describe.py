@@ -1,6 +1,7 @@
 """Stage 2: Diagram classification and multi-pass structured extraction.
 
 Pass 1 (Classification): Lightweight check — is this a coaching diagram?
+    Also returns the pitch view, which lets Pass 2d be skipped.
 Pass 2a (Players): Focused player extraction with CV context.
 Pass 2b (Arrows): Focused arrow extraction.
 Pass 2c (Equipment+Goals): Focused equipment/goals extraction with CV context.
@@ -10,20 +11,36 @@ Pass 2d (Pitch View): Pitch view classification with CV context.
 from __future__ import annotations
 
 import asyncio
-import base64
+import copy
+import hashlib
 import json
 import logging
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import httpx
+import numpy as np
+
+from .vlm_backend import (
+    VLMResponse,
+    _decode_json_object,
+    _loads_json,
+    encode_image_b64,
+    get_http_client,
+    stream_chat,
+)
 
 if TYPE_CHECKING:
     from .vlm_backend import VLMBackend
 
 logger = logging.getLogger(__name__)
 
+# How long Ollama keeps the model resident between requests
+_KEEP_ALIVE = "30m"
+
 # --- Role alias map for position standardization ---
 _ROLE_ALIASES: dict[str, str] = {
     "gk": "goalkeeper",
@@ -45,6 +62,15 @@ _ROLE_ALIASES: dict[str, str] = {
     "coach": "coach",
 }
 
+_VALID_ROLES: frozenset[str] = frozenset({
+    "goalkeeper", "attacker", "defender", "midfielder", "neutral",
+    "server", "coach",
+})
+
+# Canonical roles map to themselves so a single lookup both resolves aliases
+# and rejects unknown roles (missing key -> None).
+_ROLE_ALIASES.update({role: role for role in _VALID_ROLES})
+
 # ---------------------------------------------------------------------------
 # Pass 1: Classification prompts (lightweight)
 # ---------------------------------------------------------------------------
@@ -57,8 +83,10 @@ CLASSIFICATION_SYSTEM_PROMPT = (
 
 CLASSIFICATION_PROMPT = """Classify this image. Is it a soccer/football coaching diagram?
 
-If YES (tactical diagram with player markers, arrows, pitch lines):
-{"is_diagram": true, "description": "Brief description of the drill shown"}
+If YES (tactical diagram with player markers, arrows, pitch lines), also give the
+portion of the pitch shown: "penalty_area", "third", "half_pitch", "full_pitch",
+or "custom" if unclear:
+{"is_diagram": true, "description": "Brief description of the drill shown", "pitch_view": {"view_type": "half_pitch"}}
 
 If NO (photo, logo, book cover, decorative graphic, text-only):
 {"is_diagram": false, "description": "Brief description of what the image shows"}
@@ -70,21 +98,37 @@ Output ONLY the JSON object."""
 # Core helpers
 # ---------------------------------------------------------------------------
 
+_THINK_BLOCK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_TRAILING_COMMA_OBJ_RE = re.compile(r",\s*}")
+_TRAILING_COMMA_ARR_RE = re.compile(r",\s*]")
+# Structural tokens for the outermost-object scan: escape pairs, quotes, braces
+_JSON_TOKEN_RE = re.compile(r'\\.|"|[{}]', re.DOTALL)
+
 
 def _extract_json_from_text(text: str) -> dict | None:
-    """Extract a JSON object from text that may contain surrounding content.
+    """Extract a JSON object from text that may contain surrounding content."""
+    return _extract_json(text)[0]
+
+
+def _extract_json(text: str) -> tuple[dict | None, bool]:
+    """Extract a JSON object and report whether the text looks truncated.
 
     Tries multiple strategies:
     0. Strip <think>...</think> reasoning blocks (Qwen3-VL)
     1. Direct parse of the full text
     2. Strip markdown code fences
     3. Find the outermost { } pair
+
+    Returns (parsed, truncated). ``truncated`` is True when the response ran
+    out before the JSON object (or a <think> block) was closed, so a retry
+    with a larger token budget is more useful than a rephrased prompt.
     """
     # Strategy 0: Strip <think> reasoning blocks that consume token budget
     # Handle both closed <think>...</think> and unclosed <think>... (token limit hit)
-    cleaned = re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    cleaned = _THINK_BLOCK_RE.sub("", text)
     # If an unclosed <think> remains, strip from <think> to end (or to first {)
-    if "<think>" in cleaned:
+    unclosed_think = "<think>" in cleaned
+    if unclosed_think:
         think_start = cleaned.index("<think>")
         # Check if there's JSON after the unclosed think block
         brace_pos = cleaned.find("{", think_start)
@@ -96,69 +140,59 @@ def _extract_json_from_text(text: str) -> dict | None:
 
     # Strategy 1: Direct parse
     try:
-        return json.loads(cleaned)
+        return _loads_json(cleaned), False
     except json.JSONDecodeError:
         pass
 
     # Strategy 2: Strip markdown fences
     if cleaned.startswith("```"):
-        lines = cleaned.split("\n")
-        inner_lines = []
-        started = False
-        for line in lines:
-            if not started and line.startswith("```"):
-                started = True
-                continue
-            if started and line.strip() == "```":
-                break
-            if started:
-                inner_lines.append(line)
-        if inner_lines:
+        # Drop the opening fence line (with any language tag), then cut at the
+        # first closing fence; an unterminated fence keeps everything after it
+        _, _, rest = cleaned.partition("\n")
+        inner, _, _ = rest.partition("\n```")
+        if inner.strip():
             try:
-                return json.loads("\n".join(inner_lines))
+                return _loads_json(inner), False
             except json.JSONDecodeError:
                 pass
 
     # Strategy 3: Find outermost { } pair using brace counting
     first_brace = cleaned.find("{")
     if first_brace == -1:
-        return None
+        return None, unclosed_think
 
+    # Scan only structural tokens (escapes, quotes, braces) found by the C
+    # regex engine; everything between them is skipped without Python work.
     depth = 0
     in_string = False
-    escape_next = False
-    for i in range(first_brace, len(cleaned)):
-        c = cleaned[i]
-        if escape_next:
-            escape_next = False
-            continue
-        if c == "\\":
-            escape_next = True
-            continue
-        if c == '"' and not escape_next:
+    for m in _JSON_TOKEN_RE.finditer(cleaned, first_brace):
+        c = m.group()
+        if c == '"':
             in_string = not in_string
+        elif in_string or len(c) == 2:
+            # Inside a string, or an escape sequence (\x) anywhere
             continue
-        if in_string:
-            continue
-        if c == "{":
+        elif c == "{":
             depth += 1
-        elif c == "}":
+        else:
             depth -= 1
             if depth == 0:
-                candidate = cleaned[first_brace : i + 1]
+                candidate = cleaned[first_brace : m.end()]
                 try:
-                    return json.loads(candidate)
+                    return _loads_json(candidate), False
                 except json.JSONDecodeError:
                     # Try to fix common issues: trailing commas
-                    fixed = re.sub(r",\s*}", "}", candidate)
-                    fixed = re.sub(r",\s*]", "]", fixed)
-                    try:
-                        return json.loads(fixed)
-                    except json.JSONDecodeError:
-                        pass
-                    break
+                    if "," in candidate:
+                        fixed = _TRAILING_COMMA_OBJ_RE.sub("}", candidate)
+                        fixed = _TRAILING_COMMA_ARR_RE.sub("]", fixed)
+                        try:
+                            return _loads_json(fixed), False
+                        except json.JSONDecodeError:
+                            pass
+                    return None, False
 
-    return None
+    # Braces never balanced: the response was cut off mid-object
+    return None, True
 
 
 async def _vlm_call(
@@ -172,8 +206,8 @@ async def _vlm_call(
     *,
     vlm: VLMBackend | None = None,
     json_mode: bool = False,
-) -> str:
-    """Send an image + prompt to the VLM and return the raw text content.
+) -> VLMResponse:
+    """Send an image + prompt to the VLM and return its response.
 
     If a VLMBackend is provided via the `vlm` kwarg, it is used directly.
     Otherwise, falls back to the legacy ollama_url/model HTTP call.
@@ -191,68 +225,292 @@ async def _vlm_call(
             temperature=temperature,
             json_mode=json_mode,
         )
-        logger.debug(f"VLM raw response for {image_path.name}: {resp.content[:300]}")
-        return resp.content
+        logger.debug(
+            "VLM raw response for %s: %.300s", image_path.name, resp.content,
+        )
+        return resp
 
     # Legacy path: direct Ollama HTTP call (native /api/chat endpoint)
-    image_bytes = image_path.read_bytes()
-    image_b64 = base64.b64encode(image_bytes).decode("utf-8")
+    resp = await _ollama_chat(
+        ollama_url, model,
+        await _build_messages(image_path, system_prompt, user_prompt),
+        max_tokens=max_tokens,
+        temperature=temperature,
+        json_mode=json_mode,
+    )
+    logger.debug(
+        "VLM raw response for %s: %.300s", image_path.name, resp.content,
+    )
+    return resp
+
+
+async def _build_messages(
+    image_path: Path, system_prompt: str, user_prompt: str,
+) -> list[dict]:
+    """Build the system + image-bearing user messages for /api/chat."""
+    image_b64 = await encode_image_b64(image_path)
+    return [
+        {"role": "system", "content": system_prompt},
+        {
+            "role": "user",
+            "content": user_prompt,
+            "images": [image_b64],
+        },
+    ]
+
 
+async def _ollama_chat(
+    ollama_url: str,
+    model: str,
+    messages: list[dict],
+    max_tokens: int,
+    temperature: float,
+    json_mode: bool,
+) -> VLMResponse:
+    """POST a message list to Ollama's native /api/chat."""
     payload: dict = {
         "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {
-                "role": "user",
-                "content": user_prompt,
-                "images": [image_b64],
-            },
-        ],
+        "messages": messages,
         "options": {
             "temperature": temperature,
             "num_predict": max_tokens,
         },
         "think": False,
-        "stream": False,
+        "stream": True,
+        "keep_alive": _KEEP_ALIVE,
     }
     if json_mode:
         payload["format"] = "json"
 
-    async with httpx.AsyncClient(timeout=600.0) as client:
-        response = await client.post(
-            f"{ollama_url}/api/chat",
-            json=payload,
+    result = await stream_chat(
+        get_http_client(), f"{ollama_url}/api/chat", payload, 600.0,
+    )
+
+    content = result["message"]["content"]
+    return VLMResponse(
+        content=content,
+        model=result.get("model", model),
+        parsed=_decode_json_object(content) if json_mode else None,
+    )
+
+
+async def _warmup(
+    ollama_url: str,
+    model: str,
+    *,
+    vlm: VLMBackend | None = None,
+) -> None:
+    """Load the VLM once before a batch so concurrent requests start warm."""
+    if vlm is not None:
+        warmup = getattr(vlm, "warmup", None)
+        if warmup is not None:
+            await warmup()
+        return
+
+    if not ollama_url:
+        return
+    try:
+        response = await get_http_client().post(
+            f"{ollama_url}/api/generate",
+            json={"model": model, "keep_alive": _KEEP_ALIVE},
+            timeout=600.0,
         )
         response.raise_for_status()
-        result = response.json()
+    except httpx.HTTPError as e:
+        logger.warning(f"Ollama warmup failed for {model}: {e}")
 
-    content = result["message"]["content"]
-    logger.debug(f"VLM raw response for {image_path.name}: {content[:300]}")
-    return content
+
+async def _vlm_followup(
+    image_path: Path,
+    ollama_url: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    previous_content: str,
+    max_tokens: int = 4096,
+    temperature: float = 0.0,
+    *,
+    vlm: VLMBackend | None = None,
+    json_mode: bool = False,
+) -> VLMResponse:
+    """Retry an unparseable response as a second turn of the same chat.
+
+    The original system prompt, image, and user prompt are replayed unchanged
+    followed by the model's previous reply and a corrective user turn, so the
+    server can reuse the cached image prefix instead of re-encoding it.
+    Backends without ``chat_followup`` fall back to a standalone call with the
+    no-think system prompt.
+    """
+    if vlm is not None:
+        followup = getattr(vlm, "chat_followup", None)
+        if followup is None:
+            return await _vlm_call(
+                image_path, ollama_url, model,
+                system_prompt=system_prompt + _NO_THINK_SUFFIX,
+                user_prompt=user_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                vlm=vlm,
+                json_mode=json_mode,
+            )
+        resp = await followup(
+            image_path=image_path,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            previous_content=previous_content,
+            followup_prompt=_FOLLOWUP_PROMPT,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+        )
+        logger.debug(
+            "VLM follow-up response for %s: %.300s", image_path.name, resp.content,
+        )
+        return resp
+
+    messages = await _build_messages(image_path, system_prompt, user_prompt)
+    messages.append({"role": "assistant", "content": previous_content})
+    messages.append({"role": "user", "content": _FOLLOWUP_PROMPT})
+    resp = await _ollama_chat(
+        ollama_url, model, messages,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        json_mode=json_mode,
+    )
+    logger.debug(
+        "VLM follow-up response for %s: %.300s", image_path.name, resp.content,
+    )
+    return resp
+
+
+async def _vlm_retry(
+    image_path: Path,
+    ollama_url: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    previous: VLMResponse,
+    truncated: bool,
+    max_tokens: int = 4096,
+    *,
+    vlm: VLMBackend | None = None,
+    json_mode: bool = False,
+) -> VLMResponse:
+    """Retry a call whose response could not be parsed.
+
+    Truncated output is re-issued as a fresh call with double the token
+    budget (capped at _MAX_RETRY_TOKENS); anything else gets a corrective
+    follow-up turn on the same chat.
+    """
+    if truncated and max_tokens < _MAX_RETRY_TOKENS:
+        retry_tokens = min(max_tokens * 2, _MAX_RETRY_TOKENS)
+        logger.info(
+            f"Response for {image_path.name} truncated at {max_tokens} tokens; "
+            f"retrying with {retry_tokens}"
+        )
+        return await _vlm_call(
+            image_path, ollama_url, model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            max_tokens=retry_tokens,
+            vlm=vlm,
+            json_mode=json_mode,
+        )
+    return await _vlm_followup(
+        image_path, ollama_url, model,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        previous_content=previous.content,
+        max_tokens=max_tokens,
+        vlm=vlm,
+        json_mode=json_mode,
+    )
+
+
+def _parse_response(resp: VLMResponse) -> tuple[dict | None, bool]:
+    """Return (parsed JSON, truncated), preferring the backend's decoded JSON."""
+    if resp.parsed is not None:
+        return resp.parsed, False
+    return _extract_json(resp.content)
 
 
 # Retry system prompt suffix that suppresses think-tag reasoning
 _NO_THINK_SUFFIX = " Do NOT use <think> tags. Respond immediately with JSON."
 
+# Pitch views Pass 1 may settle on its own; anything else re-runs Pass 2d
+_PASS1_PITCH_VIEWS = frozenset({"penalty_area", "third", "half_pitch", "full_pitch"})
+
+# Upper bound on the doubled token budget used to retry truncated responses
+_MAX_RETRY_TOKENS = 16384
+
+# Corrective second turn sent when the first reply could not be parsed
+_FOLLOWUP_PROMPT = (
+    "Your previous reply was not a valid JSON object. Reply again with ONLY "
+    "the requested JSON object." + _NO_THINK_SUFFIX
+)
+
+# Below this many positions, NumPy setup costs more than scalar clamping saves
+_VECTORIZE_MIN_POSITIONS = 32
+
+# Keywords in an unparseable Pass 1 response that indicate a non-diagram
+_PHOTO_RE = re.compile(
+    r"photo(?:graph| of)|portrait|not a diagram|book cover", re.IGNORECASE
+)
+
+
+def _clamp_coordinates_np(
+    raw_positions: list[dict],
+) -> list[tuple[float, float] | None]:
+    """Parse and clamp all x/y pairs in one NumPy pass (None if unparseable).
+
+    NaN clamps to 100 and infinities to the nearest bound, matching the
+    scalar min/max path.
+    """
+    parsed: list[tuple[float, float] | None] = []
+    for pos in raw_positions:
+        try:
+            parsed.append((float(pos.get("x", 50)), float(pos.get("y", 50))))
+        except (ValueError, TypeError):
+            parsed.append(None)
+
+    valid = [xy for xy in parsed if xy is not None]
+    if not valid:
+        return parsed
+    arr = np.array(valid, dtype=np.float64)
+    np.nan_to_num(arr, copy=False, nan=100.0)
+    np.clip(arr, 0.0, 100.0, out=arr)
+    clamped = iter(arr.tolist())
+    return [tuple(next(clamped)) if xy is not None else None for xy in parsed]
+
 
 def _validate_positions(raw_positions: list[dict]) -> list[dict]:
     """Validate and clean extracted player positions.
 
-    - Clamp x, y to 0-100
+    - Clamp x, y to 0-100 (vectorized for large diagrams)
     - Reject empty/whitespace labels
     - Standardize roles via alias map
     - Deduplicate by label (first occurrence wins)
     """
-    seen_labels: set[str] = set()
-    validated: list[dict] = []
+    validated: dict[str, dict] = {}
+    coords = (
+        _clamp_coordinates_np(raw_positions)
+        if len(raw_positions) > _VECTORIZE_MIN_POSITIONS
+        else None
+    )
 
-    for pos in raw_positions:
+    for i, pos in enumerate(raw_positions):
         # Clamp coordinates
-        try:
-            x = max(0.0, min(100.0, float(pos.get("x", 50))))
-            y = max(0.0, min(100.0, float(pos.get("y", 50))))
-        except (ValueError, TypeError):
-            continue
+        if coords is not None:
+            xy = coords[i]
+            if xy is None:
+                continue
+            x, y = xy
+        else:
+            try:
+                x = max(0.0, min(100.0, float(pos.get("x", 50))))
+                y = max(0.0, min(100.0, float(pos.get("y", 50))))
+            except (ValueError, TypeError):
+                continue
 
         # Validate label
         label = str(pos.get("label", "")).strip()
@@ -260,30 +518,144 @@ def _validate_positions(raw_positions: list[dict]) -> list[dict]:
             continue
 
         # Deduplicate
-        if label in seen_labels:
+        if label in validated:
             continue
-        seen_labels.add(label)
 
         # Standardize role
+        # Non-string roles can never match an alias, so they map straight to
+        # None; already-normalized strings skip strip/lower. Results are the
+        # map's own canonical string objects, shared across all positions.
         role = pos.get("role")
-        if role is not None:
-            role = str(role).strip().lower()
-            role = _ROLE_ALIASES.get(role, role)
-            if role not in (
-                "goalkeeper", "attacker", "defender", "midfielder", "neutral",
-                "server", "coach",
-            ):
-                role = None
-
-        validated.append({
+        if isinstance(role, str):
+            role = _ROLE_ALIASES.get(role) or _ROLE_ALIASES.get(role.strip().lower())
+        else:
+            role = None
+
+        validated[label] = {
             "label": label,
             "x": x,
             "y": y,
             "role": role,
             "color": pos.get("color"),
-        })
+        }
+
+    return list(validated.values())
+
+
+# ---------------------------------------------------------------------------
+# Result cache (keyed by image content hash)
+# ---------------------------------------------------------------------------
+
+# Bump when prompts or post-processing change so cached results are not reused
+_PROMPT_VERSION = "v2"
+
+# In-process LRU in front of the on-disk cache: (digest, section) -> result.
+# Like the disk layer it is only used when a cache_dir is configured.
+_MEMORY_CACHE_SIZE = 256
+_memory_cache: OrderedDict[tuple[str, str], dict] = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+def _image_digest(image_path: Path, model: str) -> str:
+    """Hash image bytes (salted with model and prompt version) for caching."""
+    h = hashlib.blake2b(
+        f"{model}:{_PROMPT_VERSION}".encode("utf-8"), digest_size=16,
+    )
+    h.update(b"\0")
+    h.update(image_path.read_bytes())
+    return h.hexdigest()
+
+
+def _memory_cache_get(digest: str, section: str) -> dict | None:
+    with _memory_cache_lock:
+        value = _memory_cache.get((digest, section))
+        if value is not None:
+            _memory_cache.move_to_end((digest, section))
+        return value
+
+
+def _memory_cache_put(digest: str, section: str, value: dict) -> None:
+    with _memory_cache_lock:
+        _memory_cache[(digest, section)] = copy.deepcopy(value)
+        _memory_cache.move_to_end((digest, section))
+        while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _cache_lookup(
+    image_path: Path, model: str, cache_dir: Path | None, section: str,
+) -> tuple[str | None, dict | None]:
+    """Hash an image and return (digest, cached result for section or None).
+
+    The digest is None if the image cannot be read; the caller's VLM request
+    will then surface the error through its normal failure handling. Without
+    a cache_dir nothing is looked up; the digest still groups duplicates.
+    """
+    try:
+        digest = _image_digest(image_path, model)
+    except OSError:
+        return None, None
+    if cache_dir is None:
+        return digest, None
+    cached = _memory_cache_get(digest, section)
+    if cached is not None:
+        return digest, cached
+    try:
+        entry = json.loads((cache_dir / f"{digest}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return digest, None
+    cached = entry.get(section)
+    if cached is not None:
+        _memory_cache_put(digest, section, cached)
+    return digest, cached
 
-    return validated
+
+def _cache_store(
+    cache_dir: Path | None, digest: str | None, section: str, value: dict,
+) -> None:
+    """Remember a result in memory and under cache_dir/<digest>.json.
+
+    Does nothing without a cache_dir. Disk writes are best-effort.
+    """
+    if digest is None or cache_dir is None:
+        return
+    _memory_cache_put(digest, section, value)
+    path = cache_dir / f"{digest}.json"
+    try:
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entry = {}
+        entry[section] = value
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+        tmp_path.replace(path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write VLM cache entry {path.name}: {e}")
+
+
+async def _group_by_content(
+    images: dict[str, Path], model: str, cache_dir: Path | None, section: str,
+) -> tuple[dict[str, tuple[str, dict | None]], dict[str, tuple[str, Path]]]:
+    """Hash images concurrently and group identical ones.
+
+    Returns (key -> (group id, cached result or None), group id -> first
+    (key, path) needing a VLM request). Unreadable images get their own group.
+    """
+    lookups = await asyncio.gather(*(
+        asyncio.to_thread(_cache_lookup, image_path, model, cache_dir, section)
+        for image_path in images.values()
+    ))
+    groups: dict[str, tuple[str, dict | None]] = {}
+    pending: dict[str, tuple[str, Path]] = {}
+    for (key, image_path), (digest, cached) in zip(images.items(), lookups):
+        # Hex digests never contain ":", so path-based ids cannot collide
+        group = digest if digest is not None else f"path:{image_path}"
+        groups[key] = (group, cached)
+        if cached is None and group not in pending:
+            pending[group] = (key, image_path)
+    return groups, pending
 
 
 # ---------------------------------------------------------------------------
@@ -303,7 +675,26 @@ async def classify_single_diagram(
 
     Returns dict with 'is_diagram' bool and 'description' str.
     """
-    content = await _vlm_call(
+    result, _ = await _classify_image(
+        image_path, ollama_url, model, max_tokens, vlm=vlm,
+    )
+    return result
+
+
+async def _classify_image(
+    image_path: Path,
+    ollama_url: str,
+    model: str,
+    max_tokens: int,
+    *,
+    vlm: VLMBackend | None,
+) -> tuple[dict, bool]:
+    """Classify an image; returns (result, whether the reply was parsed).
+
+    An unparseable reply yields a heuristic fallback result, which callers
+    should not cache.
+    """
+    resp = await _vlm_call(
         image_path, ollama_url, model,
         system_prompt=CLASSIFICATION_SYSTEM_PROMPT,
         user_prompt=CLASSIFICATION_PROMPT,
@@ -312,36 +703,34 @@ async def classify_single_diagram(
         json_mode=True,
     )
 
-    parsed = _extract_json_from_text(content)
+    parsed, truncated = _parse_response(resp)
 
-    # Retry with thinking-suppressed prompt if first attempt fails
+    # Retry (larger budget if truncated, else a follow-up turn) on failure
     if parsed is None:
-        logger.info(f"Pass 1: Retrying {image_path.name} with no-think prompt")
-        content = await _vlm_call(
+        logger.info(f"Pass 1: Retrying {image_path.name}")
+        resp = await _vlm_retry(
             image_path, ollama_url, model,
-            system_prompt=CLASSIFICATION_SYSTEM_PROMPT + _NO_THINK_SUFFIX,
+            system_prompt=CLASSIFICATION_SYSTEM_PROMPT,
             user_prompt=CLASSIFICATION_PROMPT,
+            previous=resp,
+            truncated=truncated,
             max_tokens=max_tokens,
             vlm=vlm,
             json_mode=True,
         )
-        parsed = _extract_json_from_text(content)
+        parsed, _ = _parse_response(resp)
 
     if parsed is not None:
         if "is_diagram" not in parsed:
             parsed["is_diagram"] = True
-        return parsed
+        return parsed, True
 
     logger.warning(f"Pass 1: Could not parse JSON for {image_path.name}, using fallback")
-    lower = content.lower()
-    is_photo = any(
-        w in lower
-        for w in ("photograph", "photo of", "portrait", "not a diagram", "book cover")
-    )
+    is_photo = _PHOTO_RE.search(resp.content) is not None
     return {
         "is_diagram": not is_photo,
-        "description": content[:200],
-    }
+        "description": resp.content[:200],
+    }, False
 
 
 async def classify_diagrams(
@@ -351,32 +740,70 @@ async def classify_diagrams(
     max_tokens: int = 1024,
     *,
     vlm: VLMBackend | None = None,
+    cache_dir: Path | None = None,
+    max_concurrency: int = 8,
 ) -> dict[str, dict]:
     """Pass 1: Classify all images as diagram or non-diagram.
 
+    Up to ``max_concurrency`` VLM requests are in flight at once. Identical
+    images (by content hash) are classified once; when ``cache_dir`` is set,
+    results are persisted there (behind an in-process LRU) for reuse across
+    runs.
+
     Returns dict of image_key -> classification result.
     """
     logger.info(f"Pass 1: Classifying {len(images)} images with {model}")
-    results: dict[str, dict] = {}
+    cache_model = str(getattr(vlm, "model", model)) if vlm is not None else model
+    groups, pending = await _group_by_content(
+        images, cache_model, cache_dir, "classification",
+    )
+    # Only load the model if something actually needs a VLM request
+    if pending:
+        await _warmup(ollama_url, model, vlm=vlm)
 
-    for key, image_path in images.items():
-        logger.info(f"Pass 1: Classifying {key}")
-        try:
-            result = await classify_single_diagram(
-                image_path, ollama_url, model, max_tokens=max_tokens, vlm=vlm,
-            )
-            is_diag = result.get("is_diagram", True)
-            logger.info(
-                f"  {key}: is_diagram={is_diag}, "
-                f"desc={result.get('description', '')[:80]}..."
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def classify_one(key: str, image_path: Path) -> dict:
+        async with sem:
+            logger.info(f"Pass 1: Classifying {key}")
+            try:
+                result, parsed = await _classify_image(
+                    image_path, ollama_url, model, max_tokens, vlm=vlm,
+                )
+            except Exception as e:
+                logger.error(f"Pass 1: Failed for {key}: {e}")
+                return {
+                    "is_diagram": False,
+                    "description": f"Classification failed: {e}",
+                }
+        is_diag = result.get("is_diagram", True)
+        # %.80s truncates lazily, only if the record is emitted
+        logger.info(
+            "  %s: is_diagram=%s, desc=%.80s...",
+            key, is_diag, result.get("description", ""),
+        )
+        # A heuristic fallback is not cached, so the image is retried next run
+        if parsed:
+            await asyncio.to_thread(
+                _cache_store, cache_dir, groups[key][0], "classification", result,
             )
-            results[key] = result
-        except Exception as e:
-            logger.error(f"Pass 1: Failed for {key}: {e}")
-            results[key] = {
-                "is_diagram": False,
-                "description": f"Classification failed: {e}",
-            }
+        return result
+
+    outcomes = await asyncio.gather(*(
+        classify_one(key, image_path) for key, image_path in pending.values()
+    ))
+    fresh = dict(zip(pending, outcomes))
+
+    results: dict[str, dict] = {}
+    for key, (group, cached) in groups.items():
+        if cached is not None:
+            logger.info(f"Pass 1: Reusing cached classification for {key}")
+            results[key] = copy.deepcopy(cached)
+        elif pending[group][0] == key:
+            results[key] = fresh[group]
+        else:
+            logger.info(f"Pass 1: Reusing classification of identical image for {key}")
+            results[key] = copy.deepcopy(fresh[group])
 
     diagram_count = sum(
         1 for d in results.values() if d.get("is_diagram", False)
@@ -494,11 +921,14 @@ async def _extract_players(
     ollama_url: str = "",
     model: str = "",
     max_tokens: int = 4096,
-) -> list[dict]:
-    """Pass 2a: Extract player positions with CV context."""
+) -> tuple[list[dict], bool]:
+    """Pass 2a: Extract player positions with CV context.
+
+    Returns (players, whether the reply was parsed).
+    """
     prompt = PLAYER_PROMPT_TEMPLATE.format(cv_context=cv_context)
 
-    content = await _vlm_call(
+    resp = await _vlm_call(
         image_path, ollama_url, model,
         system_prompt=PLAYER_SYSTEM_PROMPT,
         user_prompt=prompt,
@@ -506,25 +936,27 @@ async def _extract_players(
         vlm=vlm,
         json_mode=True,
     )
-    parsed = _extract_json_from_text(content)
+    parsed, truncated = _parse_response(resp)
     if parsed is None:
-        # Retry with no-think suffix
-        content = await _vlm_call(
+        # Retry with a larger budget or a follow-up turn
+        resp = await _vlm_retry(
             image_path, ollama_url, model,
-            system_prompt=PLAYER_SYSTEM_PROMPT + _NO_THINK_SUFFIX,
+            system_prompt=PLAYER_SYSTEM_PROMPT,
             user_prompt=prompt,
+            previous=resp,
+            truncated=truncated,
             max_tokens=max_tokens,
             vlm=vlm,
             json_mode=True,
         )
-        parsed = _extract_json_from_text(content)
+        parsed, _ = _parse_response(resp)
 
     if parsed is None or not isinstance(parsed, dict):
         logger.warning(f"Pass 2a: Could not parse players for {image_path.name}")
-        return []
+        return [], False
 
-    raw = parsed.get("players", [])
-    return _validate_positions(raw) if isinstance(raw, list) else []
+    raw = parsed.get("players")
+    return (_validate_positions(raw) if isinstance(raw, list) else []), True
 
 
 async def _extract_arrows(
@@ -534,31 +966,34 @@ async def _extract_arrows(
     ollama_url: str = "",
     model: str = "",
     max_tokens: int = 4096,
-) -> list[dict]:
-    """Pass 2b: Extract movement arrows."""
-    content = await _vlm_call(
+) -> tuple[list[dict], bool]:
+    """Pass 2b: Extract movement arrows; returns (arrows, parsed)."""
+    resp = await _vlm_call(
         image_path, ollama_url, model,
         system_prompt=ARROW_SYSTEM_PROMPT,
         user_prompt=ARROW_PROMPT,
         max_tokens=max_tokens,
         vlm=vlm,
     )
-    parsed = _extract_json_from_text(content)
+    parsed, truncated = _parse_response(resp)
     if parsed is None:
-        content = await _vlm_call(
+        resp = await _vlm_retry(
             image_path, ollama_url, model,
-            system_prompt=ARROW_SYSTEM_PROMPT + _NO_THINK_SUFFIX,
+            system_prompt=ARROW_SYSTEM_PROMPT,
             user_prompt=ARROW_PROMPT,
+            previous=resp,
+            truncated=truncated,
             max_tokens=max_tokens,
             vlm=vlm,
         )
-        parsed = _extract_json_from_text(content)
+        parsed, _ = _parse_response(resp)
 
     if parsed is None or not isinstance(parsed, dict):
         logger.warning(f"Pass 2b: Could not parse arrows for {image_path.name}")
-        return []
+        return [], False
 
-    return parsed.get("arrows", []) if isinstance(parsed.get("arrows"), list) else []
+    arrows = parsed.get("arrows")
+    return (arrows if isinstance(arrows, list) else []), True
 
 
 async def _extract_equipment_goals(
@@ -569,36 +1004,38 @@ async def _extract_equipment_goals(
     ollama_url: str = "",
     model: str = "",
     max_tokens: int = 4096,
-) -> dict:
-    """Pass 2c: Extract equipment and goals."""
+) -> tuple[dict, bool]:
+    """Pass 2c: Extract equipment and goals; returns (result, parsed)."""
     prompt = EQUIPMENT_PROMPT_TEMPLATE.format(circle_count=circle_count)
 
-    content = await _vlm_call(
+    resp = await _vlm_call(
         image_path, ollama_url, model,
         system_prompt=EQUIPMENT_SYSTEM_PROMPT,
         user_prompt=prompt,
         max_tokens=max_tokens,
         vlm=vlm,
     )
-    parsed = _extract_json_from_text(content)
+    parsed, truncated = _parse_response(resp)
     if parsed is None:
-        content = await _vlm_call(
+        resp = await _vlm_retry(
             image_path, ollama_url, model,
-            system_prompt=EQUIPMENT_SYSTEM_PROMPT + _NO_THINK_SUFFIX,
+            system_prompt=EQUIPMENT_SYSTEM_PROMPT,
             user_prompt=prompt,
+            previous=resp,
+            truncated=truncated,
             max_tokens=max_tokens,
             vlm=vlm,
         )
-        parsed = _extract_json_from_text(content)
+        parsed, _ = _parse_response(resp)
 
     if parsed is None or not isinstance(parsed, dict):
         logger.warning(f"Pass 2c: Could not parse equipment for {image_path.name}")
-        return {"equipment": [], "goals": []}
+        return {"equipment": [], "goals": []}, False
 
     return {
         "equipment": parsed.get("equipment", []),
         "goals": parsed.get("goals", []),
-    }
+    }, True
 
 
 async def _extract_pitch_view(
@@ -609,11 +1046,11 @@ async def _extract_pitch_view(
     ollama_url: str = "",
     model: str = "",
     max_tokens: int = 1024,
-) -> dict | None:
-    """Pass 2d: Classify pitch view."""
+) -> tuple[dict | None, bool]:
+    """Pass 2d: Classify pitch view; returns (pitch view, parsed)."""
     prompt = PITCH_VIEW_PROMPT_TEMPLATE.format(cv_pitch_info=cv_pitch_info)
 
-    content = await _vlm_call(
+    resp = await _vlm_call(
         image_path, ollama_url, model,
         system_prompt=PITCH_VIEW_SYSTEM_PROMPT,
         user_prompt=prompt,
@@ -621,23 +1058,131 @@ async def _extract_pitch_view(
         vlm=vlm,
         json_mode=True,
     )
-    parsed = _extract_json_from_text(content)
+    parsed, truncated = _parse_response(resp)
     if parsed is None:
-        content = await _vlm_call(
+        resp = await _vlm_retry(
             image_path, ollama_url, model,
-            system_prompt=PITCH_VIEW_SYSTEM_PROMPT + _NO_THINK_SUFFIX,
+            system_prompt=PITCH_VIEW_SYSTEM_PROMPT,
             user_prompt=prompt,
+            previous=resp,
+            truncated=truncated,
             max_tokens=max_tokens,
             vlm=vlm,
             json_mode=True,
         )
-        parsed = _extract_json_from_text(content)
+        parsed, _ = _parse_response(resp)
 
     if parsed is None or not isinstance(parsed, dict):
         logger.warning(f"Pass 2d: Could not parse pitch view for {image_path.name}")
-        return None
+        return None, False
+
+    return parsed.get("pitch_view"), True
+
 
-    return parsed.get("pitch_view")
+async def _extract_single_structure(
+    key: str,
+    image_path: Path,
+    classification: dict,
+    *,
+    vlm: VLMBackend | None,
+    ollama_url: str,
+    model: str,
+    max_tokens_pass2: int,
+) -> tuple[dict, bool]:
+    """Run CV preprocessing and the focused VLM passes for one diagram.
+
+    Pass 2d is skipped when Pass 1 already returned a definite pitch view.
+    Returns (structure data, whether every VLM pass was parsed).
+    """
+    from .cv_preprocess import analyze_diagram, format_cv_context
+
+    logger.info(f"Extracting structure from {key} (multi-pass + CV)")
+
+    # Stage 1: CV preprocessing (CPU-bound; keep it off the event loop)
+    cv_analysis = await asyncio.to_thread(analyze_diagram, image_path)
+    logger.info(
+        f"  CV detected {len(cv_analysis.circles)} circles: "
+        f"{cv_analysis.circles_by_color}, view={cv_analysis.estimated_pitch_view}"
+    )
+
+    # Build CV context strings for VLM prompts
+    cv_context = format_cv_context(cv_analysis)
+    if cv_analysis.estimated_pitch_view:
+        cv_pitch_info = (
+            f"Pitch line analysis suggests this may be: "
+            f"{cv_analysis.estimated_pitch_view}"
+        )
+    else:
+        cv_pitch_info = (
+            "No strong pitch line pattern detected by computer vision."
+        )
+
+    # Stage 2: 4 focused VLM passes in parallel
+    players_task = _extract_players(
+        image_path, cv_context,
+        vlm=vlm, ollama_url=ollama_url, model=model,
+        max_tokens=max_tokens_pass2,
+    )
+    arrows_task = _extract_arrows(
+        image_path,
+        vlm=vlm, ollama_url=ollama_url, model=model,
+        max_tokens=max_tokens_pass2,
+    )
+    equipment_task = _extract_equipment_goals(
+        image_path, len(cv_analysis.circles),
+        vlm=vlm, ollama_url=ollama_url, model=model,
+        max_tokens=max_tokens_pass2,
+    )
+    pass1_view = classification.get("pitch_view")
+    if (
+        isinstance(pass1_view, dict)
+        and pass1_view.get("view_type") in _PASS1_PITCH_VIEWS
+    ):
+        outcomes = await asyncio.gather(
+            players_task, arrows_task, equipment_task,
+        )
+        (players, _), (arrows, _), (eq_goals, _) = outcomes
+        pitch_view = pass1_view
+    else:
+        pitch_view_task = _extract_pitch_view(
+            image_path, cv_pitch_info,
+            vlm=vlm, ollama_url=ollama_url, model=model,
+        )
+        outcomes = await asyncio.gather(
+            players_task, arrows_task, equipment_task, pitch_view_task,
+        )
+        (players, _), (arrows, _), (eq_goals, _), (pitch_view, _) = outcomes
+    complete = all(parsed for _, parsed in outcomes)
+
+    # Merge into unified structure dict
+    data: dict = {
+        "description": classification.get("description", ""),
+        "player_positions": players,
+        "arrows": arrows,
+        "equipment": eq_goals["equipment"],
+        "goals": eq_goals["goals"],
+        "balls": [],
+        "zones": [],
+        "pitch_view": pitch_view,
+        # Attach CV analysis for cross-validation
+        "_cv_analysis": {
+            "circles_by_color": cv_analysis.circles_by_color,
+            "total_circles": len(cv_analysis.circles),
+            "estimated_pitch_view": cv_analysis.estimated_pitch_view,
+            "circles": [
+                {"x": c.x, "y": c.y, "color": c.color_name}
+                for c in cv_analysis.circles
+            ],
+        },
+    }
+
+    logger.info(
+        f"  {key}: {len(players)} players, {len(arrows)} arrows, "
+        f"{len(data['equipment'])} equipment, "
+        f"{len(data['goals'])} goals, "
+        f"view={pitch_view}"
+    )
+    return data, complete
 
 
 async def extract_diagram_structures(
@@ -648,103 +1193,82 @@ async def extract_diagram_structures(
     max_tokens_pass2: int = 4096,
     *,
     vlm: VLMBackend | None = None,
+    cache_dir: Path | None = None,
+    max_concurrency: int = 8,
 ) -> dict[str, dict]:
     """Run multi-pass extraction on all confirmed diagrams.
 
     For each diagram:
     1. CV preprocessing (sync, <100ms)
-    2. 4 focused VLM passes in parallel (2a: players, 2b: arrows, 2c: equipment, 2d: pitch view)
+    2. 4 focused VLM passes in parallel (2a: players, 2b: arrows, 2c: equipment, 2d: pitch view);
+       2d is skipped when Pass 1 already classified the pitch view
     3. Merge results into unified dict
 
+    Up to ``max_concurrency`` diagrams are processed at once. Identical images
+    (by content hash) are extracted once; when ``cache_dir`` is set, results
+    are persisted there (behind an in-process LRU) for reuse across runs. A diagram whose
+    extraction raises is logged and left out of the result (nothing is
+    cached for it), so one bad image does not abort the batch. Results with
+    an unparseable sub-pass are returned but not cached.
+
     Returns dict of image_key -> enriched structure data.
     """
-    from .cv_preprocess import analyze_diagram, format_cv_context
-
-    results: dict[str, dict] = {}
-    diagram_count = 0
-
-    for key, image_path in images.items():
-        classification = classifications.get(key, {})
-        if not classification.get("is_diagram", False):
-            continue
-
-        diagram_count += 1
-        logger.info(f"Extracting structure from {key} (multi-pass + CV)")
+    diagrams = {
+        key: image_path
+        for key, image_path in images.items()
+        if classifications.get(key, {}).get("is_diagram", False)
+    }
+    cache_model = str(getattr(vlm, "model", model)) if vlm is not None else model
+    groups, pending = await _group_by_content(
+        diagrams, cache_model, cache_dir, "extraction",
+    )
+    # Only load the model if something actually needs a VLM request
+    if pending:
+        await _warmup(ollama_url, model, vlm=vlm)
 
-        # Stage 1: CV preprocessing
-        cv_analysis = analyze_diagram(image_path)
-        logger.info(
-            f"  CV detected {len(cv_analysis.circles)} circles: "
-            f"{cv_analysis.circles_by_color}, view={cv_analysis.estimated_pitch_view}"
-        )
+    sem = asyncio.Semaphore(max_concurrency)
 
-        # Build CV context strings for VLM prompts
-        cv_context = format_cv_context(cv_analysis)
-        if cv_analysis.estimated_pitch_view:
-            cv_pitch_info = (
-                f"Pitch line analysis suggests this may be: "
-                f"{cv_analysis.estimated_pitch_view}"
-            )
-        else:
-            cv_pitch_info = (
-                "No strong pitch line pattern detected by computer vision."
+    async def extract_one(key: str, image_path: Path) -> dict | None:
+        async with sem:
+            try:
+                data, complete = await _extract_single_structure(
+                    key, image_path, classifications[key],
+                    vlm=vlm, ollama_url=ollama_url, model=model,
+                    max_tokens_pass2=max_tokens_pass2,
+                )
+            except Exception as e:
+                logger.error(f"Pass 2: Failed for {key}: {e}")
+                return None
+        # A sub-pass that could not be parsed is not cached, so the diagram
+        # is retried next run
+        if complete:
+            await asyncio.to_thread(
+                _cache_store, cache_dir, groups[key][0], "extraction", data,
             )
+        return data
 
-        # Stage 2: 4 focused VLM passes in parallel
-        players_task = _extract_players(
-            image_path, cv_context,
-            vlm=vlm, ollama_url=ollama_url, model=model,
-            max_tokens=max_tokens_pass2,
-        )
-        arrows_task = _extract_arrows(
-            image_path,
-            vlm=vlm, ollama_url=ollama_url, model=model,
-            max_tokens=max_tokens_pass2,
-        )
-        equipment_task = _extract_equipment_goals(
-            image_path, len(cv_analysis.circles),
-            vlm=vlm, ollama_url=ollama_url, model=model,
-            max_tokens=max_tokens_pass2,
-        )
-        pitch_view_task = _extract_pitch_view(
-            image_path, cv_pitch_info,
-            vlm=vlm, ollama_url=ollama_url, model=model,
-        )
-
-        players, arrows, eq_goals, pitch_view = await asyncio.gather(
-            players_task, arrows_task, equipment_task, pitch_view_task,
-        )
-
-        # Merge into unified structure dict
-        data: dict = {
-            "description": classification.get("description", ""),
-            "player_positions": players,
-            "arrows": arrows,
-            "equipment": eq_goals.get("equipment", []),
-            "goals": eq_goals.get("goals", []),
-            "balls": [],
-            "zones": [],
-            "pitch_view": pitch_view,
-            # Attach CV analysis for cross-validation
-            "_cv_analysis": {
-                "circles_by_color": cv_analysis.circles_by_color,
-                "total_circles": len(cv_analysis.circles),
-                "estimated_pitch_view": cv_analysis.estimated_pitch_view,
-                "circles": [
-                    {"x": c.x, "y": c.y, "color": c.color_name}
-                    for c in cv_analysis.circles
-                ],
-            },
-        }
-
-        logger.info(
-            f"  {key}: {len(players)} players, {len(arrows)} arrows, "
-            f"{len(eq_goals.get('equipment', []))} equipment, "
-            f"{len(eq_goals.get('goals', []))} goals, "
-            f"view={pitch_view}"
-        )
+    outcomes = await asyncio.gather(*(
+        extract_one(key, image_path) for key, image_path in pending.values()
+    ))
+    fresh = dict(zip(pending, outcomes))
 
+    results: dict[str, dict] = {}
+    for key, (group, cached) in groups.items():
+        if cached is None and fresh[group] is None:
+            # Failed diagrams keep only their Pass 1 classification
+            continue
+        if cached is None and pending[group][0] == key:
+            results[key] = fresh[group]
+            continue
+        if cached is not None:
+            logger.info(f"Reusing cached structure for {key}")
+        else:
+            logger.info(f"Reusing structure of identical image for {key}")
+        data = copy.deepcopy(cached if cached is not None else fresh[group])
+        data["description"] = classifications[key].get("description", "")
         results[key] = data
 
-    logger.info(f"Multi-pass extraction complete: {diagram_count} diagrams")
+    logger.info(
+        f"Multi-pass extraction complete: {len(results)}/{len(diagrams)} diagrams"
+    )
     return results
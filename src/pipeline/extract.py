@@ -1,9 +1,19 @@
 """Stage 3: Extract structured SessionPlan from decomposed content."""
 
+import functools
+import hashlib
 import logging
 import re
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import TypeVar
+
+import numpy as np
 
 from src.schemas.session_plan import (
     SessionPlan,
@@ -70,13 +80,123 @@ _NON_DRILL_PATTERNS = [
 _SUBSECTION_RE = re.compile(
     "|".join(_SUBSECTION_PATTERNS), re.IGNORECASE
 )
+
+# Non-drill headers without internal whitespace variants; only "part N" and
+# "table of contents" spellings need _NON_DRILL_RE
+_NON_DRILL_LITERALS = frozenset({
+    "author", "authors", "acknowledgment", "acknowledgments",
+    "content", "contents", "table of content", "table of contents",
+    "introduction", "foreword", "preface", "bibliography", "references",
+    "index", "appendix", "glossary",
+})
+
+# Common exact sub-section headers (lowercase, trailing colons removed); a hit
+# skips the regex. Every entry must also match _SUBSECTION_RE.
+_SUBSECTION_LITERALS = frozenset({
+    "setup", "setup and organisation", "setup and organization",
+    "organisation", "organization",
+    "sequence",
+    "process", "process and objectives", "objective", "objectives",
+    "execution", "procedure",
+    "progression", "progressions", "progression(s)",
+    "regression", "regressions", "regression(s)",
+    "variation", "variations",
+    "coaching point", "coaching points", "coaching tip", "coaching tips",
+    "coaching note", "coaching notes", "coaching task", "coaching tasks",
+    "key point", "key points",
+    "rule", "rules", "constraint", "constraints",
+    "scoring", "point", "points",
+    "equipment", "material", "materials",
+})
 _NON_DRILL_RE = re.compile(
     "|".join(_NON_DRILL_PATTERNS), re.IGNORECASE
 )
 
+# Sub-section header prefix -> canonical field name. Each named group is a
+# field; alternatives are tried in order, so "points?$" only matches after
+# every other prefix has failed. Objectives map to sequence/process.
+_SUBSECTION_FIELD_RE = re.compile(
+    r"(?P<setup>setup|organi[sz]ation)"
+    r"|(?P<sequence>sequence|execution|procedure|process|objective)"
+    r"|(?P<progressions>progression|regression|variation|advance)"
+    r"|(?P<coaching_points>coaching|key\s+point)"
+    r"|(?P<rules>rule|constraint)"
+    r"|(?P<scoring>scoring|points?$)"
+    r"|(?P<equipment>equipment|material)"
+)
+# Group number -> interned field name. Group names from the pattern are not
+# interned, so subsection dicts keyed by them would miss the identity fast
+# path on the .get("setup") style lookups in _parse_drill_texts.
+_SUBSECTION_FIELD_NAMES = (None,) + tuple(
+    sys.intern(name)
+    for name, _ in sorted(
+        _SUBSECTION_FIELD_RE.groupindex.items(), key=lambda item: item[1],
+    )
+)
+# Literal sub-section header -> field, so a common header is both detected
+# and classified by one dict lookup
+_SUBSECTION_LITERAL_FIELDS = {
+    literal: _SUBSECTION_FIELD_NAMES[_SUBSECTION_FIELD_RE.match(literal).lastindex]
+    for literal in _SUBSECTION_LITERALS
+}
+
+# Markdown structure
+# "\s" minus "\n" keeps a header match on its own line
+_HEADER_RE = re.compile(r"^#{2,3}[^\S\n]+(.+)$", re.MULTILINE)
+_CLEAN_HEADER_RE = re.compile(r"^#+\s*")
+_LIST_PREFIX_RE = re.compile(r"^[-*\d.()]+\s+")
+_LIST_PREFIX_CHARS = "-*0123456789.()"
+
+# Setup details
+# Player count and area dimensions, found in a single scan of the setup text
+_SETUP_META_RE = re.compile(
+    r"(?P<player_count>\d+\s*(?:v|vs)\s*\d+[^.\n]*|"
+    r"\d+\s+(?:field\s+)?players?[^.\n]*|"
+    r"(?:goalkeeper|GK)\s+plus\s+\d+[^.\n]*)|"
+    r"(?P<area_dimensions>\d+\s*x\s*\d+\s*(?:meters?|yards?|m)[^.\n]*)",
+    re.IGNORECASE,
+)
+
+# Session metadata
+_TITLE_H1_RE = re.compile(r"^#\s+(.+?)$", re.MULTILINE)
+# First # or ## header; h1 is tried first, so an h2 match means no # header
+# starts at or before it
+_TITLE_RE = re.compile(r"^#\s+(?P<h1>.+?)$|^##\s+(?P<h2>.+?)$", re.MULTILINE)
+# The full-markdown metadata scans use ASCII case folding for their ASCII
+# keywords, which is cheaper per position than Unicode folding. Separators and
+# captured words stay Unicode via (?u:...), so NBSP gaps from PDF text and
+# accented values still match.
+_INLINE_META_RE = re.compile(
+    r"Category(?u:\s*):(?u:\s*)(.+?)(?u:\s+)Difficulty(?u:\s*):(?u:\s*)((?u:\w+))",
+    re.ASCII | re.IGNORECASE,
+)
+# "Key: Value" metadata lines; the named group that matched is the field.
+# Each alternative starts with a different keyword, so at most one can match
+# at a given line start.
+_METADATA_RE = re.compile(
+    r"^(?:(?:Category|Topic|Theme)(?u:\s*):(?u:\s*)(?P<category>.+?)$"
+    r"|(?:Difficulty|Level)(?u:\s*):(?u:\s*)(?P<difficulty>(?u:\w+))"
+    r"|(?:Author|Coach|Created(?u:\s+)by)(?u:\s*):(?u:\s*)(?P<author>.+?)$"
+    r"|(?:Desired(?u:\s+)Outcome|Learning(?u:\s+)Objective"
+    r"|Session(?u:\s+)Objective|Aim)(?u:\s*):(?u:\s*)(?P<desired_outcome>.+?)$)",
+    re.ASCII | re.IGNORECASE | re.MULTILINE,
+)
+# Leading word of every _METADATA_RE alternative, lowercase
+_METADATA_KEYWORDS = (
+    "category", "topic", "theme", "difficulty", "level", "author", "coach",
+    "created", "desired", "learning", "session", "aim",
+)
+# Kept out of _METADATA_RE: alone, its leading "##" literal lets the regex
+# engine skip ahead, which the line-anchored alternation cannot
+_AUTHORS_SECTION_RE = re.compile(
+    r"##\s+AUTHORS?\s*\n+(.+?)(?=\n##|\Z)", re.DOTALL | re.IGNORECASE
+)
+_AUTHOR_NAME_RE = re.compile(r"\*\*(.+?)\*\*|^([A-Z][a-z]+\s+[A-Z][a-z]+)")
+
 
 def _first_line_name(text: str, max_len: int = 60) -> str:
     """Extract the first meaningful line from text as a drill name."""
+    # split("\n") as in _parse_block; strip() removes a trailing "\r"
     for line in text.strip().split("\n"):
         stripped = line.strip()
         if stripped and not stripped.startswith(("!", "[", "<!--")):
@@ -86,52 +206,152 @@ def _first_line_name(text: str, max_len: int = 60) -> str:
     return ""
 
 
+def _title_key(text: str) -> str:
+    """Normalize a drill name or session title for title-card comparison."""
+    return text.strip().lower().rstrip(":;., ")
+
+
 def _is_title_card(drill_name: str, title: str) -> bool:
     """Check if a drill name is just the session title repeated."""
-    a = drill_name.strip().lower().rstrip(":;., ")
-    b = title.strip().lower().rstrip(":;., ")
-    if not a or not b:
+    a = _title_key(drill_name)
+    if not a:
         return False
-    if a == b:
-        return True
-    if a in b or b in a:
+    b = _title_key(title)
+    if not b:
+        return False
+    # Equal or contained (only the shorter can be inside the longer)
+    shorter, longer = (a, b) if len(a) <= len(b) else (b, a)
+    if shorter in longer:
         return True
     # First 30 chars match (truncated titles)
-    if len(a) > 20 and len(b) > 20 and a[:30] == b[:30]:
-        return True
-    return False
+    return len(shorter) > 20 and a[:30] == b[:30]
+
+
+def _subsection_field(header_text: str) -> str | None:
+    """Return the canonical field name of a drill sub-section header.
+
+    Returns None if the header is not a sub-section (Setup, Sequence, etc.).
+    The header is normalized once for both the check and the classification.
+    """
+    header = header_text.strip()
+    key = header.lower().rstrip(":")
+    field = _SUBSECTION_LITERAL_FIELDS.get(key)
+    if field is not None:
+        return field
+    if not _SUBSECTION_RE.match(header):
+        return None
+    return _field_for_key(key)
 
 
 def _is_subsection_header(header_text: str) -> bool:
     """Check if a header is a drill sub-section (Setup, Sequence, etc.)."""
-    return bool(_SUBSECTION_RE.match(header_text.strip()))
+    return _subsection_field(header_text) is not None
 
 
 def _is_non_drill_header(header_text: str) -> bool:
     """Check if a header is book structure (AUTHORS, PART ONE, etc.)."""
-    return bool(_NON_DRILL_RE.match(header_text.strip()))
+    header = header_text.strip()
+    key = header.casefold()
+    if key in _NON_DRILL_LITERALS:
+        return True
+    return key.startswith(("part", "table")) and bool(_NON_DRILL_RE.match(header))
+
+
+def _field_for_key(key: str) -> str:
+    """Map a normalized (lowercase, colon-stripped) header to a field name."""
+    match = _SUBSECTION_FIELD_RE.match(key)
+    return _SUBSECTION_FIELD_NAMES[match.lastindex] if match else "setup"
 
 
 def _classify_subsection(header_text: str) -> str:
     """Classify a sub-section header into a canonical field name."""
-    h = header_text.strip().lower().rstrip(":")
-    if re.match(r"setup|organi[sz]ation", h):
-        return "setup"
-    if re.match(r"sequence|execution|procedure|process", h):
-        return "sequence"
-    if re.match(r"progression|regression|variation|advance", h):
-        return "progressions"
-    if re.match(r"coaching|key\s+point", h):
-        return "coaching_points"
-    if re.match(r"rule|constraint", h):
-        return "rules"
-    if re.match(r"scoring|points?$", h):
-        return "scoring"
-    if re.match(r"equipment|material", h):
-        return "equipment"
-    if re.match(r"objective", h):
-        return "sequence"  # Objectives map to sequence/process
-    return "setup"
+    return _field_for_key(header_text.strip().lower().rstrip(":"))
+
+
+# Enum value -> member, so unknown VLM strings fall back without an exception
+_PITCH_VIEW_TYPES = {member.value: member for member in PitchViewType}
+_ARROW_TYPES = {member.value: member for member in ArrowType}
+_EQUIPMENT_TYPES = {member.value: member for member in EquipmentType}
+
+# Lists longer than this are clamped in one NumPy pass
+_VECTORIZE_MIN_ITEMS = 32
+
+# (key, default) coordinate fields per element type; a None default marks an
+# optional field that stays None when absent
+_POSITION_COORDS = (("x", 50), ("y", 50))
+_ARROW_COORDS = (("start_x", 50), ("start_y", 50), ("end_x", 50), ("end_y", 50))
+_EQUIPMENT_COORDS = (("x", 50), ("y", 50), ("x2", None), ("y2", None))
+_ZONE_COORDS = (("x1", 0), ("y1", 0), ("x2", 100), ("y2", 100))
+
+
+def _clamp(val: float, lo: float = 0.0, hi: float = 100.0) -> float:
+    """Clamp a float value to [lo, hi] (NaN clamps to hi, like min/max)."""
+    # Comparisons only; avoids two builtin calls per coordinate
+    if lo <= val <= hi:
+        return val
+    return lo if val < lo else hi
+
+
+def _coerce_coords(
+    item: dict, fields: tuple[tuple[str, float | None], ...],
+) -> list[float | None] | str:
+    """Convert an item's coordinate fields to floats (unclamped).
+
+    Returns an error message instead of raising for values that are not
+    numbers or numeric strings; only numeric-string parsing can raise.
+    """
+    row: list[float | None] = []
+    for key, default in fields:
+        value = item.get(key, default)
+        if value is None and default is None:
+            row.append(None)
+        elif isinstance(value, (int, float)):
+            row.append(float(value))
+        elif isinstance(value, str):
+            try:
+                row.append(float(value))
+            except ValueError:
+                return f"invalid {key}: {value!r}"
+        else:
+            return f"invalid {key}: {value!r}"
+    return row
+
+
+def _parse_coords(
+    items: list[dict], fields: tuple[tuple[str, float | None], ...],
+) -> list[list[float | None] | str]:
+    """Parse and clamp the coordinate fields of each item to 0-100.
+
+    Returns one row per item, or an error message for items whose
+    coordinates are unparseable. Long lists are clamped in one NumPy pass,
+    where NaN clamps to 100 and infinities to the nearest bound, matching
+    the scalar min/max path.
+    """
+    rows = [_coerce_coords(item, fields) for item in items]
+
+    if len(items) <= _VECTORIZE_MIN_ITEMS:
+        clamp = _clamp
+        return [
+            row if isinstance(row, str)
+            else [None if v is None else clamp(v) for v in row]
+            for row in rows
+        ]
+
+    valid = [row for row in rows if not isinstance(row, str)]
+    if not valid:
+        return rows
+    arr = np.array(
+        [[0.0 if v is None else v for v in row] for row in valid],
+        dtype=np.float64,
+    )
+    np.nan_to_num(arr, copy=False, nan=100.0)
+    np.clip(arr, 0.0, 100.0, out=arr)
+    clamped = iter(arr.tolist())
+    return [
+        row if isinstance(row, str)
+        else [None if v is None else c for v, c in zip(row, next(clamped))]
+        for row in rows
+    ]
 
 
 def _parse_player_positions(positions_data: list[dict]) -> list[PlayerPosition]:
@@ -140,10 +360,13 @@ def _parse_player_positions(positions_data: list[dict]) -> list[PlayerPosition]:
     Applies defensive clamping: x,y clamped to 0-100, empty labels skipped.
     """
     result = []
-    for pos in positions_data:
+    coords = _parse_coords(positions_data, _POSITION_COORDS)
+    for pos, xy in zip(positions_data, coords):
+        if isinstance(xy, str):
+            logger.warning(f"Skipping invalid position: {pos} - {xy}")
+            continue
         try:
-            x = max(0.0, min(100.0, float(pos.get("x", 50))))
-            y = max(0.0, min(100.0, float(pos.get("y", 50))))
+            x, y = xy
             label = str(pos.get("label", "Unknown")).strip()
             if not label:
                 continue
@@ -161,21 +384,15 @@ def _parse_player_positions(positions_data: list[dict]) -> list[PlayerPosition]:
     return result
 
 
-def _clamp(val: float, lo: float = 0.0, hi: float = 100.0) -> float:
-    """Clamp a float value to [lo, hi]."""
-    return max(lo, min(hi, val))
-
-
 def _parse_pitch_view(data: dict | None) -> PitchView | None:
     """Convert VLM pitch_view data to PitchView model."""
     if not data or not isinstance(data, dict):
         return None
     try:
-        view_type_str = str(data.get("view_type", "half_pitch")).lower()
-        try:
-            view_type = PitchViewType(view_type_str)
-        except ValueError:
-            view_type = PitchViewType.HALF_PITCH
+        view_type = _PITCH_VIEW_TYPES.get(
+            str(data.get("view_type", "half_pitch")).lower(),
+            PitchViewType.HALF_PITCH,
+        )
         return PitchView(
             view_type=view_type,
             length_meters=data.get("length_meters"),
@@ -190,19 +407,23 @@ def _parse_pitch_view(data: dict | None) -> PitchView | None:
 def _parse_movement_arrows(arrows_data: list[dict]) -> list[MovementArrow]:
     """Convert VLM arrow data to MovementArrow models with coordinate clamping."""
     result = []
-    for arrow in arrows_data:
+    coords = _parse_coords(arrows_data, _ARROW_COORDS)
+    for arrow, xy in zip(arrows_data, coords):
+        if isinstance(xy, str):
+            logger.warning(f"Skipping invalid arrow: {arrow} - {xy}")
+            continue
         try:
-            arrow_type_str = str(arrow.get("arrow_type", "movement")).lower()
-            try:
-                arrow_type = ArrowType(arrow_type_str)
-            except ValueError:
-                arrow_type = ArrowType.MOVEMENT
+            arrow_type = _ARROW_TYPES.get(
+                str(arrow.get("arrow_type", "movement")).lower(),
+                ArrowType.MOVEMENT,
+            )
+            start_x, start_y, end_x, end_y = xy
             result.append(
                 MovementArrow(
-                    start_x=_clamp(float(arrow.get("start_x", 50))),
-                    start_y=_clamp(float(arrow.get("start_y", 50))),
-                    end_x=_clamp(float(arrow.get("end_x", 50))),
-                    end_y=_clamp(float(arrow.get("end_y", 50))),
+                    start_x=start_x,
+                    start_y=start_y,
+                    end_x=end_x,
+                    end_y=end_y,
                     arrow_type=arrow_type,
                     from_label=arrow.get("from_label"),
                     to_label=arrow.get("to_label"),
@@ -218,19 +439,23 @@ def _parse_movement_arrows(arrows_data: list[dict]) -> list[MovementArrow]:
 def _parse_equipment(equipment_data: list[dict]) -> list[EquipmentObject]:
     """Convert VLM equipment data to EquipmentObject models."""
     result = []
-    for eq in equipment_data:
+    coords = _parse_coords(equipment_data, _EQUIPMENT_COORDS)
+    for eq, xy in zip(equipment_data, coords):
+        if isinstance(xy, str):
+            logger.warning(f"Skipping invalid equipment: {eq} - {xy}")
+            continue
         try:
-            eq_type_str = str(eq.get("equipment_type", "cone")).lower()
-            try:
-                eq_type = EquipmentType(eq_type_str)
-            except ValueError:
-                eq_type = EquipmentType.CONE
+            eq_type = _EQUIPMENT_TYPES.get(
+                str(eq.get("equipment_type", "cone")).lower(),
+                EquipmentType.CONE,
+            )
+            x, y, x2, y2 = xy
             obj = EquipmentObject(
                 equipment_type=eq_type,
-                x=_clamp(float(eq.get("x", 50))),
-                y=_clamp(float(eq.get("y", 50))),
-                x2=_clamp(float(eq["x2"])) if eq.get("x2") is not None else None,
-                y2=_clamp(float(eq["y2"])) if eq.get("y2") is not None else None,
+                x=x,
+                y=y,
+                x2=x2,
+                y2=y2,
                 label=eq.get("label"),
                 color=eq.get("color"),
             )
@@ -243,12 +468,17 @@ def _parse_equipment(equipment_data: list[dict]) -> list[EquipmentObject]:
 def _parse_goals(goals_data: list[dict]) -> list[GoalInfo]:
     """Convert VLM goal data to GoalInfo models."""
     result = []
-    for goal in goals_data:
+    coords = _parse_coords(goals_data, _POSITION_COORDS)
+    for goal, xy in zip(goals_data, coords):
+        if isinstance(xy, str):
+            logger.warning(f"Skipping invalid goal: {goal} - {xy}")
+            continue
         try:
+            x, y = xy
             result.append(
                 GoalInfo(
-                    x=_clamp(float(goal.get("x", 50))),
-                    y=_clamp(float(goal.get("y", 50))),
+                    x=x,
+                    y=y,
                     goal_type=str(goal.get("goal_type", "full_goal")),
                     width_meters=goal.get("width_meters"),
                 )
@@ -261,12 +491,17 @@ def _parse_goals(goals_data: list[dict]) -> list[GoalInfo]:
 def _parse_balls(balls_data: list[dict]) -> list[BallPosition]:
     """Convert VLM ball data to BallPosition models."""
     result = []
-    for ball in balls_data:
+    coords = _parse_coords(balls_data, _POSITION_COORDS)
+    for ball, xy in zip(balls_data, coords):
+        if isinstance(xy, str):
+            logger.warning(f"Skipping invalid ball: {ball} - {xy}")
+            continue
         try:
+            x, y = xy
             result.append(
                 BallPosition(
-                    x=_clamp(float(ball.get("x", 50))),
-                    y=_clamp(float(ball.get("y", 50))),
+                    x=x,
+                    y=y,
                     label=ball.get("label"),
                 )
             )
@@ -278,15 +513,20 @@ def _parse_balls(balls_data: list[dict]) -> list[BallPosition]:
 def _parse_zones(zones_data: list[dict]) -> list[PitchZone]:
     """Convert VLM zone data to PitchZone models."""
     result = []
-    for zone in zones_data:
+    coords = _parse_coords(zones_data, _ZONE_COORDS)
+    for zone, xy in zip(zones_data, coords):
+        if isinstance(xy, str):
+            logger.warning(f"Skipping invalid zone: {zone} - {xy}")
+            continue
         try:
+            x1, y1, x2, y2 = xy
             result.append(
                 PitchZone(
                     zone_type=str(zone.get("zone_type", "area")),
-                    x1=_clamp(float(zone.get("x1", 0))),
-                    y1=_clamp(float(zone.get("y1", 0))),
-                    x2=_clamp(float(zone.get("x2", 100))),
-                    y2=_clamp(float(zone.get("y2", 100))),
+                    x1=x1,
+                    y1=y1,
+                    x2=x2,
+                    y2=y2,
                     label=zone.get("label"),
                     color=zone.get("color"),
                 )
@@ -296,93 +536,110 @@ def _parse_zones(zones_data: list[dict]) -> list[PitchZone]:
     return result
 
 
-def _extract_list_items(text: str) -> list[str]:
-    """Extract bulleted/numbered list items from a text block."""
-    items = []
-    for line in text.strip().split("\n"):
-        line = line.strip()
-        if not line:
-            continue
-        # Skip HTML comments (<!-- image --> markers from Docling)
-        if line.startswith("<!--"):
-            continue
-        # Strip bullet/number prefix
-        cleaned = re.sub(r"^[-*\d.()]+\s+", "", line).strip()
-        if cleaned and len(cleaned) > 2:
-            # Skip page numbers (bare digits)
-            if cleaned.isdigit():
-                continue
-            # Skip image markers that survived cleaning
-            if "<!-- image -->" in cleaned:
-                cleaned = cleaned.replace("<!-- image -->", "").strip()
-                if not cleaned:
-                    continue
-            items.append(cleaned)
-    return items
+def _strip_list_prefix(line: str) -> str:
+    """Remove a leading bullet/number marker, as _LIST_PREFIX_RE.sub would.
+
+    Uses str.lstrip for the common ASCII markers and only falls back to the
+    regex when a non-ASCII digit (which \\d also matches) follows them.
+    """
+    rest = line.lstrip(_LIST_PREFIX_CHARS)
+    if rest[:1].isdecimal():
+        return _LIST_PREFIX_RE.sub("", line)
+    if len(rest) < len(line) and rest[:1].isspace():
+        return rest.lstrip()
+    return line
+
 
+def _parse_block(text: str) -> tuple[list[str], str]:
+    """Extract list items and body text from a text block in one pass.
 
-def _extract_body_text(text: str) -> str:
-    """Extract body text, removing list markers and image comments."""
+    Returns (items, body): bulleted/numbered list items, and the body text
+    with list markers and image comments removed.
+    """
+    items = []
     lines = []
-    for line in text.strip().split("\n"):
+    # split("\n"), not splitlines(): form feeds and other separators that
+    # splitlines() honours are common in PDF text and stay inside a line
+    for line in text.split("\n"):
         line = line.strip()
-        if not line:
+        # Skip blanks and HTML comments (<!-- image --> markers from Docling)
+        if not line or line.startswith("<!--"):
             continue
-        # Skip HTML comments
-        if line.startswith("<!--"):
-            continue
-        # Skip page numbers
-        if line.isdigit():
+        # Strip bullet/number prefix
+        cleaned = _strip_list_prefix(line).strip()
+        # Remove inline image markers that survived cleaning
+        text_line = (
+            cleaned.replace("<!-- image -->", "").strip()
+            if "<!-- image -->" in cleaned
+            else cleaned
+        )
+        if not text_line:
             continue
-        cleaned = re.sub(r"^[-*\d.()]+\s+", "", line).strip()
-        # Remove inline image markers
-        cleaned = cleaned.replace("<!-- image -->", "").strip()
-        if cleaned:
-            lines.append(cleaned)
-    return "\n".join(lines)
+        # Skip page numbers (bare digits, before or after prefix stripping)
+        if not line.isdigit():
+            lines.append(text_line)
+        if len(cleaned) > 2 and not cleaned.isdigit():
+            items.append(text_line)
+    return items, "\n".join(lines)
 
 
-def _split_into_header_sections(markdown: str) -> list[tuple[str, str]]:
+def _iter_header_matches(markdown: str) -> Iterator[re.Match]:
+    """Yield _HEADER_RE matches in order, only trying lines that start with ##.
+
+    Same results as _HEADER_RE.finditer, but str.find skips straight to the
+    next "\n##" so the regex never runs on ordinary content lines.
+    """
+    if markdown.startswith("##"):
+        match = _HEADER_RE.match(markdown)
+        if match:
+            yield match
+    pos = markdown.find("\n##")
+    while pos != -1:
+        match = _HEADER_RE.match(markdown, pos + 1)
+        if match:
+            yield match
+        pos = markdown.find("\n##", pos + 1)
+
+
+def _split_into_header_sections(markdown: str) -> Iterator[tuple[str, str]]:
     """Split markdown into (header_text, body_text) pairs.
 
-    Returns list of tuples where header_text is the ## header content
+    Yields tuples where header_text is the ## header content
     and body_text is everything until the next ## header.
     The first entry may have an empty header (content before first ##).
     """
-    sections = []
-    lines = markdown.split("\n")
-    current_header = ""
-    current_body_lines = []
-
-    for line in lines:
-        header_match = re.match(r"^#{2,3}\s+(.+)$", line)
-        if header_match:
-            # Save previous section
-            if current_header or current_body_lines:
-                sections.append(
-                    (current_header, "\n".join(current_body_lines))
-                )
-            current_header = header_match.group(1).strip()
-            current_body_lines = []
-        else:
-            current_body_lines.append(line)
-
-    # Save last section
-    if current_header or current_body_lines:
-        sections.append((current_header, "\n".join(current_body_lines)))
-
-    return sections
+    matches = _iter_header_matches(markdown)
+    match = next(matches, None)
+    if match is None:
+        yield ("", markdown)
+        return
+
+    if match.start() > 0:
+        # Content before the first header (minus its trailing newline)
+        yield ("", markdown[: match.start() - 1])
+
+    while match is not None:
+        following = next(matches, None)
+        body_end = following.start() - 1 if following else len(markdown)
+        header = match.group(1).strip()
+        body_start = match.end() + 1
+        # A blank header directly followed by another header (or the end of
+        # the text) has no body lines at all, so it is dropped
+        if header or body_start <= body_end:
+            yield (header, markdown[body_start:body_end])
+        match = following
 
 
 def _group_drill_sections(
-    sections: list[tuple[str, str]],
-) -> list[dict]:
+    sections: Iterable[tuple[str, str]],
+) -> Iterator[dict]:
     """Group ## headers into drills with their sub-sections.
 
     A drill starts with a header that is NOT a sub-section header and NOT
     a non-drill header. Sub-section headers that follow are grouped under it.
+    Each drill is yielded as soon as the next one starts.
 
-    Returns list of dicts:
+    Yields dicts:
     {
         'name': str,
         'body': str,           # Body text directly under the drill header
@@ -394,7 +651,7 @@ def _group_drill_sections(
         'all_text': str,       # Combined text for this drill group
     }
     """
-    drills = []
+    drill_count = 0
     current_drill = None
 
     for header, body in sections:
@@ -403,7 +660,7 @@ def _group_drill_sections(
             continue
 
         # Clean the header
-        clean_header = re.sub(r"^#+\s*", "", header).strip("*# ")
+        clean_header = _CLEAN_HEADER_RE.sub("", header).strip("*# ")
 
         if _is_non_drill_header(clean_header):
             # Book structure header - attach body to current drill if exists,
@@ -412,17 +669,18 @@ def _group_drill_sections(
                 current_drill["body"] += "\n" + body
             continue
 
-        if _is_subsection_header(clean_header):
+        field = _subsection_field(clean_header)
+        if field is not None:
             # This is a sub-section - attach to current drill
             if current_drill is not None:
-                field = _classify_subsection(clean_header)
                 existing = current_drill["subsections"].get(field, "")
                 if existing and field == "setup":
                     # Repeated setup/organisation → new drill block.
-                    drills.append(current_drill)
+                    yield current_drill
+                    drill_count += 1
                     auto_name = _first_line_name(body)
                     if not auto_name:
-                        auto_name = f"Section {len(drills) + 1}"
+                        auto_name = f"Section {drill_count + 1}"
                     current_drill = {
                         "name": auto_name,
                         "body": "",
@@ -443,7 +701,8 @@ def _group_drill_sections(
 
         # This is a new drill header
         if current_drill is not None:
-            drills.append(current_drill)
+            yield current_drill
+            drill_count += 1
 
         current_drill = {
             "name": clean_header,
@@ -453,23 +712,74 @@ def _group_drill_sections(
 
     # Don't forget the last drill
     if current_drill is not None:
-        drills.append(current_drill)
+        yield current_drill
 
-    return drills
+
+def _scan_first_groups(pattern: re.Pattern, text: str) -> dict[str, str]:
+    """Find the first match of every named group in an alternation in one scan.
+
+    The scan resumes just after each match start rather than its end, so a
+    long match (e.g. one running to the end of the line, or whose leading
+    whitespace spills onto the next line) cannot hide another group's match
+    inside it.
+    """
+    found: dict[str, str] = {}
+    pos = 0
+    while len(found) < pattern.groups:
+        match = pattern.search(text, pos)
+        if not match:
+            break
+        found.setdefault(match.lastgroup, match.group(match.lastgroup))
+        pos = match.start() + 1
+    return found
 
 
-def _extract_metadata_field(
-    text: str, pattern: str, max_length: int = 100
-) -> str | None:
-    """Extract a metadata field with strict matching.
+def _next_line_start(lowered: str, keyword: str, pos: int) -> int:
+    """Return the next line start after pos where keyword begins, or -1."""
+    idx = lowered.find("\n" + keyword, pos)
+    return idx + 1 if idx != -1 else -1
 
-    Only matches "Key: Value" on a single line, with value capped.
+
+def _scan_metadata_fields(
+    markdown: str, lowered: str | None = None,
+) -> dict[str, str]:
+    """Find the first "Key: Value" line for every metadata field.
+
+    Returns raw values keyed by field name (category, difficulty, author,
+    desired_outcome). Rather than trying the regex at every position, each
+    keyword is located at line starts with str.find on the lowercased text
+    and the regex is only matched there. ``lowered`` may be passed in if the
+    caller already has ``markdown.lower()``.
     """
-    match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-    if not match:
+    if lowered is None:
+        lowered = markdown.lower()
+    if len(lowered) != len(markdown):
+        # Lowercasing expanded a character, so offsets no longer line up
+        return _scan_first_groups(_METADATA_RE, markdown)
+
+    # field -> (position, value) of its earliest match
+    earliest: dict[str, tuple[int, str]] = {}
+    for keyword in _METADATA_KEYWORDS:
+        # Only line starts can match, so look for the keyword after a newline
+        pos = 0 if lowered.startswith(keyword) else _next_line_start(
+            lowered, keyword, 0,
+        )
+        while pos != -1:
+            match = _METADATA_RE.match(markdown, pos)
+            if match:
+                field = match.lastgroup
+                if field not in earliest or pos < earliest[field][0]:
+                    earliest[field] = (pos, match.group(field))
+                break
+            pos = _next_line_start(lowered, keyword, pos)
+    return {field: value for field, (_, value) in earliest.items()}
+
+
+def _cap_metadata_value(value: str | None, max_length: int = 100) -> str | None:
+    """Strip and cap a metadata value to avoid paragraph leakage."""
+    if value is None:
         return None
-    value = match.group(1).strip()
-    # Cap length to avoid paragraph leakage
+    value = value.strip()
     if len(value) > max_length:
         # Truncate at first sentence or line break
         for sep in [". ", "\n", ",  "]:
@@ -482,30 +792,84 @@ def _extract_metadata_field(
     return value if value else None
 
 
-def _extract_drill_blocks(
-    markdown: str,
-    diagram_descriptions: dict[str, dict],
-    images: dict[str, Path],
-    session_title: str = "",
-) -> list[DrillBlock]:
-    """Parse drill blocks from markdown content with VLM enrichment."""
-    sections = _split_into_header_sections(markdown)
-    drill_groups = _group_drill_sections(sections)
-
-    # Filter title-card drill: first group matching session title with no subsections
-    if (
-        drill_groups
-        and session_title
-        and not drill_groups[0]["subsections"]
-        and _is_title_card(drill_groups[0]["name"], session_title)
-    ):
-        drill_groups = drill_groups[1:]
-
-    image_keys = list(images.keys())
-    image_idx = 0
-    drills: list[DrillBlock] = []
+@dataclass(frozen=True)
+class _DrillText:
+    """Text fields of one drill, parsed from markdown (cacheable)."""
+
+    name: str
+    setup_desc: str
+    player_count: str | None
+    area_dimensions: str | None
+    equipment: tuple[str, ...]
+    sequence: tuple[str, ...]
+    rules: tuple[str, ...]
+    scoring: tuple[str, ...]
+    coaching_points: tuple[str, ...]
+    progressions: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class _MetadataText:
+    """Session metadata fields parsed from markdown (cacheable)."""
+
+    title: str
+    category: str | None
+    difficulty: str | None
+    author: str | None
+    desired_outcome: str | None
+
+
+# Parsed text is memoized per document, so re-extracting the same document
+# (retries, re-ingest) skips the regex work. Entries are keyed on a digest of
+# the markdown rather than the text itself, so the cache does not pin whole
+# documents. Only immutable values are cached; models are rebuilt per call so
+# IDs and timestamps stay fresh.
+_PARSE_CACHE_SIZE = 32
+
+_T = TypeVar("_T")
+
+
+def _memoize_parse(func: Callable[[str, str], _T]) -> Callable[[str, str], _T]:
+    """LRU-memoize a ``(markdown, arg)`` parser keyed on the markdown digest."""
+    cache: OrderedDict[tuple[bytes, str], _T] = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(markdown: str, arg: str) -> _T:
+        digest = hashlib.blake2b(markdown.encode("utf-8"), digest_size=16).digest()
+        key = (digest, arg)
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = func(markdown, arg)
+        with lock:
+            cache[key] = value
+            while len(cache) > _PARSE_CACHE_SIZE:
+                cache.popitem(last=False)
+        return value
+
+    wrapper.cache_clear = cache.clear  # type: ignore[attr-defined]
+    return wrapper
+
+
+@_memoize_parse
+def _parse_drill_texts(markdown: str, session_title: str) -> tuple[_DrillText, ...]:
+    """Parse the text fields of every drill in the markdown."""
+    drill_groups = _group_drill_sections(_split_into_header_sections(markdown))
+    drills: list[_DrillText] = []
+
+    for index, group in enumerate(drill_groups):
+        # Filter title-card drill: first group matching session title with
+        # no subsections
+        if (
+            index == 0
+            and session_title
+            and not group["subsections"]
+            and _is_title_card(group["name"], session_title)
+        ):
+            continue
 
-    for group in drill_groups:
         name = group["name"]
         if not name or len(name) < 3:
             continue
@@ -530,65 +894,82 @@ def _extract_drill_blocks(
             # Use the drill body as setup if no explicit setup section
             setup_text = group["body"]
 
-        setup_desc = _extract_body_text(setup_text)
+        _, setup_desc = _parse_block(setup_text)
         equipment_text = group["subsections"].get("equipment", "")
-        equipment = _extract_list_items(equipment_text) if equipment_text else []
-
-        # Extract player count from setup text
-        player_count = None
-        pc_match = re.search(
-            r"(\d+\s*(?:v|vs)\s*\d+[^.\n]*|"
-            r"\d+\s+(?:field\s+)?players?[^.\n]*|"
-            r"(?:goalkeeper|GK)\s+plus\s+\d+[^.\n]*)",
-            setup_text,
-            re.IGNORECASE,
-        )
-        if pc_match:
-            player_count = pc_match.group(0).strip()
-
-        # Area dimensions from setup
-        area_dimensions = None
-        area_match = re.search(
-            r"(\d+\s*x\s*\d+\s*(?:meters?|yards?|m)[^.\n]*)",
-            setup_text,
-            re.IGNORECASE,
-        )
-        if area_match:
-            area_dimensions = area_match.group(1).strip()
+        equipment = _parse_block(equipment_text)[0] if equipment_text else []
+
+        # Player count and area dimensions from setup text
+        setup_meta = _scan_first_groups(_SETUP_META_RE, setup_text)
+        player_count = setup_meta.get("player_count")
+        if player_count is not None:
+            player_count = player_count.strip()
+        area_dimensions = setup_meta.get("area_dimensions")
+        if area_dimensions is not None:
+            area_dimensions = area_dimensions.strip()
 
         # Sequence / Process
         seq_text = group["subsections"].get("sequence", "")
-        sequence = _extract_list_items(seq_text) if seq_text else []
+        sequence = _parse_block(seq_text)[0] if seq_text else []
 
         # Rules
         rules_text = group["subsections"].get("rules", "")
-        rules = _extract_list_items(rules_text) if rules_text else []
+        rules = _parse_block(rules_text)[0] if rules_text else []
 
         # Scoring
         scoring_text = group["subsections"].get("scoring", "")
-        scoring = _extract_list_items(scoring_text) if scoring_text else []
+        scoring = _parse_block(scoring_text)[0] if scoring_text else []
 
         # Coaching points
         cp_text = group["subsections"].get("coaching_points", "")
-        coaching_points = _extract_list_items(cp_text) if cp_text else []
+        coaching_points = _parse_block(cp_text)[0] if cp_text else []
 
         # Progressions
         prog_text = group["subsections"].get("progressions", "")
-        progressions = _extract_list_items(prog_text) if prog_text else []
+        progressions = _parse_block(prog_text)[0] if prog_text else []
 
-        # Assign diagram - skip non-diagram images BEFORE assignment
-        diagram = DiagramInfo()
-        while image_idx < len(image_keys):
-            key = image_keys[image_idx]
-            desc = diagram_descriptions.get(key, {})
-            if not desc.get("is_diagram", False):
-                # Skip non-diagram images (logos, photos, etc.)
-                image_idx += 1
-                continue
+        drills.append(
+            _DrillText(
+                name=name,
+                setup_desc=setup_desc,
+                player_count=player_count,
+                area_dimensions=area_dimensions,
+                equipment=tuple(equipment),
+                sequence=tuple(sequence),
+                rules=tuple(rules),
+                scoring=tuple(scoring),
+                coaching_points=tuple(coaching_points),
+                progressions=tuple(progressions),
+            )
+        )
+
+    return tuple(drills)
+
+
+def _extract_drill_blocks(
+    markdown: str,
+    diagram_descriptions: dict[str, dict],
+    images: dict[str, Path],
+    session_title: str = "",
+) -> list[DrillBlock]:
+    """Parse drill blocks from markdown content with VLM enrichment."""
+    # Pair each diagram image with its description up front, skipping
+    # non-diagram images (logos, photos, etc.) so assignment is in order
+    diagram_bundles = [
+        (str(path), desc)
+        for key, path in images.items()
+        if (desc := diagram_descriptions.get(key, {})).get("is_diagram", False)
+    ]
+    bundle_idx = 0
+    drills: list[DrillBlock] = []
 
-            # Found a diagram — assign it to this drill
+    for text in _parse_drill_texts(markdown, session_title):
+        # Assign the next diagram to this drill
+        diagram = DiagramInfo()
+        if bundle_idx < len(diagram_bundles):
+            image_ref, desc = diagram_bundles[bundle_idx]
+            bundle_idx += 1
             diagram = DiagramInfo(
-                image_ref=str(images[key]),
+                image_ref=image_ref,
                 description=desc.get("description", ""),
                 player_positions=_parse_player_positions(
                     desc.get("player_positions", [])
@@ -600,113 +981,80 @@ def _extract_drill_blocks(
                 balls=_parse_balls(desc.get("balls", [])),
                 zones=_parse_zones(desc.get("zones", [])),
             )
-            image_idx += 1
-            break
 
         drill = DrillBlock(
-            name=name,
+            name=text.name,
             setup=DrillSetup(
-                description=setup_desc,
-                player_count=player_count,
-                equipment=equipment,
-                area_dimensions=area_dimensions,
+                description=text.setup_desc,
+                player_count=text.player_count,
+                equipment=list(text.equipment),
+                area_dimensions=text.area_dimensions,
             ),
             diagram=diagram,
-            sequence=sequence,
-            rules=rules,
-            scoring=scoring,
-            coaching_points=coaching_points,
-            progressions=progressions,
+            sequence=list(text.sequence),
+            rules=list(text.rules),
+            scoring=list(text.scoring),
+            coaching_points=list(text.coaching_points),
+            progressions=list(text.progressions),
         )
         drills.append(drill)
 
     return drills
 
 
-async def extract_session_plan(
-    document: DecomposedDocument,
-    diagram_descriptions: dict[str, dict],
-    source_filename: str,
-) -> SessionPlan:
-    """Extract a structured SessionPlan from decomposed document content.
-
-    Args:
-        document: Decomposed PDF content from Stage 1.
-        diagram_descriptions: VLM analysis results from Stage 2.
-        source_filename: Original PDF filename.
-
-    Returns:
-        SessionPlan model with extracted content.
-    """
-    logger.info(f"Extracting session plan from {source_filename}")
-    markdown = document.markdown
-
-    # --- Metadata extraction ---
-    # Title: first # header, or fallback to filename
-    title = ""
-    title_match = re.search(r"^#\s+(.+?)$", markdown, re.MULTILINE)
+@_memoize_parse
+def _parse_metadata(markdown: str, source_filename: str) -> _MetadataText:
+    """Parse title, category, difficulty, author and desired outcome."""
+    # Title: first # header, else first ## header, else the filename
+    title_match = _TITLE_RE.search(markdown)
     if title_match:
-        title = title_match.group(1).strip()
+        title = title_match.group(title_match.lastgroup)
+        if title_match.lastgroup == "h2":
+            # A # header further down still takes precedence
+            h1_match = _TITLE_H1_RE.search(markdown, title_match.start() + 1)
+            if h1_match:
+                title = h1_match.group(1)
+        title = title.strip()
     else:
-        # Try first ## header as title
-        h2_match = re.search(r"^##\s+(.+?)$", markdown, re.MULTILINE)
-        if h2_match:
-            title = h2_match.group(1).strip()
-        else:
-            title = (
-                Path(source_filename)
-                .stem.replace("_", " ")
-                .replace("-", " ")
-                .title()
-            )
+        title = (
+            Path(source_filename)
+            .stem.replace("_", " ")
+            .replace("-", " ")
+            .title()
+        )
+
+    # Cheap keyword gates; each regex below only runs if its keywords occur
+    lowered = markdown.lower()
 
     # Try inline "Category: X Difficulty: Y" pattern first (common format)
     category = None
     difficulty = None
-    inline_match = re.search(
-        r"Category\s*:\s*(.+?)\s+Difficulty\s*:\s*(\w+)",
-        markdown,
-        re.IGNORECASE,
-    )
+    inline_match = None
+    if "category" in lowered and "difficulty" in lowered:
+        inline_match = _INLINE_META_RE.search(markdown)
     if inline_match:
         category = inline_match.group(1).strip()[:60]
         difficulty = inline_match.group(2).strip()
 
     # Fallback: separate lines
+    fields = _scan_metadata_fields(markdown, lowered)
     if not category:
-        category = _extract_metadata_field(
-            markdown,
-            r"^(?:Category|Topic|Theme)\s*:\s*(.+?)$",
-            max_length=60,
-        )
+        category = _cap_metadata_value(fields.get("category"), max_length=60)
     if not difficulty:
-        difficulty = _extract_metadata_field(
-            markdown,
-            r"^(?:Difficulty|Level)\s*:\s*(\w+)",
-            max_length=30,
-        )
+        difficulty = _cap_metadata_value(fields.get("difficulty"), max_length=30)
 
     # Author: strict pattern, or look for AUTHORS section in book-format
-    author = _extract_metadata_field(
-        markdown,
-        r"^(?:Author|Coach|Created\s+by)\s*:\s*(.+?)$",
-        max_length=100,
-    )
+    author = _cap_metadata_value(fields.get("author"), max_length=100)
     if not author:
         # Book format: look for ## AUTHORS section
-        authors_match = re.search(
-            r"##\s+AUTHORS?\s*\n+(.+?)(?=\n##|\Z)",
-            markdown,
-            re.DOTALL | re.IGNORECASE,
-        )
+        authors_match = None
+        if "author" in lowered:
+            authors_match = _AUTHORS_SECTION_RE.search(markdown)
         if authors_match:
             # Extract just the first author name (bold or first sentence)
             author_text = authors_match.group(1).strip()
             # Look for bold names or names before comma
-            name_match = re.search(
-                r"\*\*(.+?)\*\*|^([A-Z][a-z]+\s+[A-Z][a-z]+)",
-                author_text,
-            )
+            name_match = _AUTHOR_NAME_RE.search(author_text)
             if name_match:
                 author = (name_match.group(1) or name_match.group(2)).strip()
             else:
@@ -716,13 +1064,11 @@ async def extract_session_plan(
                     author = first_sentence.strip()
 
     # Desired outcome / learning objective
-    desired_outcome = _extract_metadata_field(
-        markdown,
-        r"^(?:Desired\s+Outcome|Learning\s+Objective|Session\s+Objective|Aim)\s*:\s*(.+?)$",
-        max_length=200,
+    desired_outcome = _cap_metadata_value(
+        fields.get("desired_outcome"), max_length=200,
     )
 
-    metadata = SessionMetadata(
+    return _MetadataText(
         title=title,
         category=category,
         difficulty=difficulty,
@@ -730,6 +1076,36 @@ async def extract_session_plan(
         desired_outcome=desired_outcome,
     )
 
+
+async def extract_session_plan(
+    document: DecomposedDocument,
+    diagram_descriptions: dict[str, dict],
+    source_filename: str,
+) -> SessionPlan:
+    """Extract a structured SessionPlan from decomposed document content.
+
+    Args:
+        document: Decomposed PDF content from Stage 1.
+        diagram_descriptions: VLM analysis results from Stage 2.
+        source_filename: Original PDF filename.
+
+    Returns:
+        SessionPlan model with extracted content.
+    """
+    logger.info(f"Extracting session plan from {source_filename}")
+    markdown = document.markdown
+
+    metadata_text = _parse_metadata(markdown, source_filename)
+    title = metadata_text.title
+
+    metadata = SessionMetadata(
+        title=title,
+        category=metadata_text.category,
+        difficulty=metadata_text.difficulty,
+        author=metadata_text.author,
+        desired_outcome=metadata_text.desired_outcome,
+    )
+
     drills = _extract_drill_blocks(
         markdown, diagram_descriptions, document.images,
         session_title=title,
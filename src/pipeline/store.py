@@ -2,93 +2,186 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+import orjson
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 if TYPE_CHECKING:
+    import asyncpg
+
     from src.schemas.session_plan import DrillBlock
 
 from src.schemas.session_plan import SessionPlan
 
 logger = logging.getLogger(__name__)
 
+# Column order for COPY; matches the keys of the per-row parameter dicts
+_DRILL_COLUMNS = (
+    "id", "session_plan_id", "name", "setup_description", "player_count",
+    "equipment", "area_dimensions", "sequence", "rules", "scoring",
+    "coaching_points", "progressions", "description", "image_ref", "raw_json",
+)
+_TACTICAL_COLUMNS = (
+    "drill_block_id", "methodology", "game_element", "lanes", "situation_type",
+)
+
+# Statements are built once at import; SQLAlchemy's compiled cache and
+# asyncpg's per-connection prepared-statement cache then reuse them.
+_DRILL_EXISTS_SQL = text(
+    "SELECT 1 FROM drill_blocks "
+    "WHERE id = ANY(CAST(:ids AS uuid[])) LIMIT 1"
+)
+_INSERT_DRILL_SQL = text("""
+    INSERT INTO drill_blocks (id, session_plan_id, name, setup_description,
+                              player_count, equipment, area_dimensions,
+                              sequence, rules, scoring, coaching_points,
+                              progressions, description, image_ref, raw_json)
+    VALUES (:id, :session_plan_id, :name, :setup_description,
+            :player_count, :equipment, :area_dimensions,
+            :sequence, :rules, :scoring, :coaching_points,
+            :progressions, :description, :image_ref, :raw_json)
+    ON CONFLICT (id) DO UPDATE SET
+        raw_json = EXCLUDED.raw_json
+""")
+_INSERT_TACTICAL_SQL = text("""
+    INSERT INTO tactical_contexts (drill_block_id, methodology,
+                                   game_element, lanes, situation_type)
+    VALUES (:drill_block_id, :methodology, :game_element,
+            :lanes, :situation_type)
+""")
+_UPSERT_PLAN_SQL = text("""
+    INSERT INTO session_plans (id, title, category, difficulty, author,
+                               source_filename, source_page_count,
+                               extraction_timestamp, raw_json)
+    VALUES (:id, :title, :category, :difficulty, :author,
+            :source_filename, :source_page_count,
+            :extraction_timestamp, :raw_json)
+    ON CONFLICT (id) DO UPDATE SET
+        raw_json = EXCLUDED.raw_json,
+        updated_at = NOW()
+""")
+_DELETE_DRILLS_SQL = text(
+    "DELETE FROM drill_blocks WHERE session_plan_id = :plan_id"
+)
+_UPDATE_PLAN_SQL = text("""
+    UPDATE session_plans
+    SET title = :title,
+        category = :category,
+        difficulty = :difficulty,
+        author = :author,
+        raw_json = :raw_json,
+        updated_at = NOW()
+    WHERE id = :id
+""")
+_SELECT_PLAN_SQL = text("SELECT raw_json FROM session_plans WHERE id = :id")
+# Served by the covering idx_session_plans_created_at index (scripts/init-db.sql)
+_LIST_PLANS_SQL = text("""
+    SELECT id, title, category, difficulty, author,
+           source_filename, extraction_timestamp, created_at
+    FROM session_plans
+    ORDER BY created_at DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+
+async def _copy_connection(
+    drill_ids: list[str], db: AsyncSession,
+) -> asyncpg.Connection | None:
+    """Return the raw asyncpg connection if the drills can be COPY'd.
+
+    COPY has no ON CONFLICT, so it is only used when none of the drill IDs
+    exist yet (the common first-store and replace paths). Returns None for
+    other drivers or when an upsert is needed.
+    """
+    conn = await db.connection()
+    if conn.dialect.driver != "asyncpg":
+        return None
+    existing = await db.execute(_DRILL_EXISTS_SQL, {"ids": drill_ids})
+    if existing.first() is not None:
+        return None
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection
+
 
 async def _insert_drill_blocks(
     plan_id: UUID,
     drills: list["DrillBlock"],
+    drill_jsons: list[dict],
     db: AsyncSession,
 ) -> None:
     """Insert drill blocks and their tactical contexts for a session plan.
 
+    Fresh drills are streamed with COPY; if any drill already exists, each
+    table is upserted with a single executemany call instead.
+
     Args:
         plan_id: UUID of the parent session plan.
         drills: List of DrillBlock objects to insert.
+        drill_jsons: JSON-mode dumps of the drills, in the same order
+            (sliced from the plan dump so each drill is serialized once).
         db: Async database session (caller manages commit).
     """
-    for drill in drills:
-        drill_json = drill.model_dump(mode="json")
-        await db.execute(
-            text("""
-                INSERT INTO drill_blocks (id, session_plan_id, name, setup_description,
-                                          player_count, equipment, area_dimensions,
-                                          sequence, rules, scoring, coaching_points,
-                                          progressions, description, image_ref, raw_json)
-                VALUES (:id, :session_plan_id, :name, :setup_description,
-                        :player_count, :equipment, :area_dimensions,
-                        :sequence, :rules, :scoring, :coaching_points,
-                        :progressions, :description, :image_ref, :raw_json)
-                ON CONFLICT (id) DO UPDATE SET
-                    raw_json = EXCLUDED.raw_json
-            """),
-            {
-                "id": str(drill.id),
-                "session_plan_id": str(plan_id),
-                "name": drill.name,
-                "setup_description": drill.setup.description,
-                "player_count": drill.setup.player_count,
-                "equipment": drill.setup.equipment,
-                "area_dimensions": drill.setup.area_dimensions,
-                "sequence": drill.sequence,
-                "rules": drill.rules,
-                "scoring": drill.scoring,
-                "coaching_points": drill.coaching_points,
-                "progressions": drill.progressions,
-                "description": drill.diagram.description,
-                "image_ref": drill.diagram.image_ref,
-                "raw_json": json.dumps(drill_json),
-            },
-        )
+    if not drills:
+        return
 
-        if drill.tactical_context:
-            tc = drill.tactical_context
-            await db.execute(
-                text("""
-                    INSERT INTO tactical_contexts (drill_block_id, methodology,
-                                                   game_element, lanes, situation_type)
-                    VALUES (:drill_block_id, :methodology, :game_element,
-                            :lanes, :situation_type)
-                """),
-                {
-                    "drill_block_id": str(drill.id),
-                    "methodology": tc.methodology,
-                    "game_element": (
-                        tc.game_element.value if tc.game_element else None
-                    ),
-                    "lanes": (
-                        [lane.value for lane in tc.lanes]
-                        if tc.lanes
-                        else []
-                    ),
-                    "situation_type": (
-                        tc.situation_type.value if tc.situation_type else None
-                    ),
-                },
+    drill_params = [
+        {
+            "id": str(drill.id),
+            "session_plan_id": str(plan_id),
+            "name": drill.name,
+            "setup_description": drill.setup.description,
+            "player_count": drill.setup.player_count,
+            "equipment": drill.setup.equipment,
+            "area_dimensions": drill.setup.area_dimensions,
+            "sequence": drill.sequence,
+            "rules": drill.rules,
+            "scoring": drill.scoring,
+            "coaching_points": drill.coaching_points,
+            "progressions": drill.progressions,
+            "description": drill.diagram.description,
+            "image_ref": drill.diagram.image_ref,
+            "raw_json": orjson.dumps(drill_json).decode(),
+        }
+        for drill, drill_json in zip(drills, drill_jsons)
+    ]
+    tc_params = [
+        {
+            "drill_block_id": str(drill.id),
+            "methodology": tc.methodology,
+            "game_element": tc.game_element.value if tc.game_element else None,
+            "lanes": [lane.value for lane in tc.lanes] if tc.lanes else [],
+            "situation_type": (
+                tc.situation_type.value if tc.situation_type else None
+            ),
+        }
+        for drill in drills
+        if (tc := drill.tactical_context)
+    ]
+    copy_conn = await _copy_connection([p["id"] for p in drill_params], db)
+    if copy_conn is not None:
+        await copy_conn.copy_records_to_table(
+            "drill_blocks",
+            records=[tuple(p[c] for c in _DRILL_COLUMNS) for p in drill_params],
+            columns=_DRILL_COLUMNS,
+        )
+        if tc_params:
+            await copy_conn.copy_records_to_table(
+                "tactical_contexts",
+                records=[
+                    tuple(p[c] for c in _TACTICAL_COLUMNS) for p in tc_params
+                ],
+                columns=_TACTICAL_COLUMNS,
             )
+        return
+
+    await db.execute(_INSERT_DRILL_SQL, drill_params)
+
+    if tc_params:
+        await db.execute(_INSERT_TACTICAL_SQL, tc_params)
 
 
 async def store_session_plan(
@@ -110,17 +203,7 @@ async def store_session_plan(
     plan_id = session_plan.id
 
     await db.execute(
-        text("""
-            INSERT INTO session_plans (id, title, category, difficulty, author,
-                                       source_filename, source_page_count,
-                                       extraction_timestamp, raw_json)
-            VALUES (:id, :title, :category, :difficulty, :author,
-                    :source_filename, :source_page_count,
-                    :extraction_timestamp, :raw_json)
-            ON CONFLICT (id) DO UPDATE SET
-                raw_json = EXCLUDED.raw_json,
-                updated_at = NOW()
-        """),
+        _UPSERT_PLAN_SQL,
         {
             "id": str(plan_id),
             "title": session_plan.metadata.title,
@@ -130,11 +213,13 @@ async def store_session_plan(
             "source_filename": session_plan.source.filename,
             "source_page_count": session_plan.source.page_count,
             "extraction_timestamp": session_plan.source.extraction_timestamp,
-            "raw_json": json.dumps(plan_json),
+            "raw_json": orjson.dumps(plan_json).decode(),
         },
     )
 
-    await _insert_drill_blocks(plan_id, session_plan.drills, db)
+    await _insert_drill_blocks(
+        plan_id, session_plan.drills, plan_json["drills"], db,
+    )
 
     await db.commit()
     logger.info(
@@ -163,35 +248,25 @@ async def replace_session_plan(
     plan_json = session_plan.model_dump(mode="json")
 
     # Delete existing drill blocks (CASCADE deletes tactical_contexts)
-    await db.execute(
-        text("DELETE FROM drill_blocks WHERE session_plan_id = :plan_id"),
-        {"plan_id": str(plan_id)},
-    )
+    await db.execute(_DELETE_DRILLS_SQL, {"plan_id": str(plan_id)})
 
     # Update session plan row
     await db.execute(
-        text("""
-            UPDATE session_plans
-            SET title = :title,
-                category = :category,
-                difficulty = :difficulty,
-                author = :author,
-                raw_json = :raw_json,
-                updated_at = NOW()
-            WHERE id = :id
-        """),
+        _UPDATE_PLAN_SQL,
         {
             "id": str(plan_id),
             "title": session_plan.metadata.title,
             "category": session_plan.metadata.category,
             "difficulty": session_plan.metadata.difficulty,
             "author": session_plan.metadata.author,
-            "raw_json": json.dumps(plan_json),
+            "raw_json": orjson.dumps(plan_json).decode(),
         },
     )
 
     # Insert new drill blocks + tactical contexts
-    await _insert_drill_blocks(plan_id, session_plan.drills, db)
+    await _insert_drill_blocks(
+        plan_id, session_plan.drills, plan_json["drills"], db,
+    )
 
     await db.commit()
     logger.info(
@@ -203,15 +278,12 @@ async def get_session_plan(
     plan_id: UUID, db: AsyncSession
 ) -> dict | None:
     """Retrieve a session plan by ID."""
-    result = await db.execute(
-        text("SELECT raw_json FROM session_plans WHERE id = :id"),
-        {"id": str(plan_id)},
-    )
+    result = await db.execute(_SELECT_PLAN_SQL, {"id": str(plan_id)})
     row = result.fetchone()
     if row is None:
         return None
     data = row[0]
-    return json.loads(data) if isinstance(data, str) else data
+    return orjson.loads(data) if isinstance(data, str) else data
 
 
 async def list_session_plans(
@@ -219,30 +291,25 @@ async def list_session_plans(
 ) -> list[dict]:
     """List stored session plans."""
     result = await db.execute(
-        text("""
-            SELECT id, title, category, difficulty, author,
-                   source_filename, extraction_timestamp, created_at
-            FROM session_plans
-            ORDER BY created_at DESC
-            LIMIT :limit OFFSET :offset
-        """),
-        {"limit": limit, "offset": offset},
+        _LIST_PLANS_SQL, {"limit": limit, "offset": offset}
     )
-    rows = result.fetchall()
+    # Unpack each row once; positional tuple access is cheaper per row than
+    # .mappings() key lookups
     return [
         {
-            "id": str(row[0]),
-            "title": row[1],
-            "category": row[2],
-            "difficulty": row[3],
-            "author": row[4],
-            "source_filename": row[5],
+            "id": str(plan_id),
+            "title": title,
+            "category": category,
+            "difficulty": difficulty,
+            "author": author,
+            "source_filename": source_filename,
             "extraction_timestamp": (
-                row[6].isoformat() if row[6] else None
+                extracted_at.isoformat() if extracted_at else None
             ),
-            "created_at": row[7].isoformat() if row[7] else None,
+            "created_at": created_at.isoformat() if created_at else None,
         }
-        for row in rows
+        for (
+            plan_id, title, category, difficulty, author,
+            source_filename, extracted_at, created_at,
+        ) in result
     ]
-
-
@@ -55,48 +55,77 @@ LANE_KEYWORDS: dict[str, LaneName] = {
     "right flank": LaneName.RIGHT_WING,
 }
 
+# Numerical advantage/overload, e.g. "4v2", "3 vs 1", "5 versus 4"
+_NUMERICAL_RE = re.compile(r"(\d+)\s*(?:v|vs|versus)\s*(\d+)", re.IGNORECASE)
+
+
+# Keywords that suggest a coaching methodology, checked in order
+_METHODOLOGY_KEYWORDS: dict[str, str] = {
+    "peters": "Peters/Schumacher 2v1",
+    "schumacher": "Peters/Schumacher 2v1",
+    "2v1": "Peters/Schumacher 2v1",
+    "2 v 1": "Peters/Schumacher 2v1",
+    "rondo": "Rondo",
+    "positional play": "Positional Play",
+}
 
-def _detect_game_element(text: str) -> GameElement | None:
-    """Detect game element from text content."""
+
+def _scan_tactical_keywords(
+    text: str,
+) -> tuple[str | None, GameElement | None, SituationType | None, list[LaneName]]:
+    """Detect methodology, game element, situation type and lanes in text.
+
+    The text is lowercased once and shared by all four keyword tables. Each
+    table keeps its own priority order: the first keyword listed that occurs
+    anywhere in the text wins, not the first occurrence.
+    """
     text_lower = text.lower()
+
+    methodology = None
+    for keyword, name in _METHODOLOGY_KEYWORDS.items():
+        if keyword in text_lower:
+            methodology = name
+            break
+
+    game_element = None
     for keyword, element in GAME_ELEMENT_KEYWORDS.items():
         if keyword in text_lower:
-            return element
-    return None
+            game_element = element
+            break
+
+    situation_type = None
+    for keyword, situation in SITUATION_KEYWORDS.items():
+        if keyword in text_lower:
+            situation_type = situation
+            break
+
+    # Several keywords map to one lane; an insertion-ordered dict keeps the
+    # first-hit order without re-scanning the result for duplicates
+    lanes = list(dict.fromkeys(
+        lane for keyword, lane in LANE_KEYWORDS.items() if keyword in text_lower
+    ))
+
+    return methodology, game_element, situation_type, lanes
+
+
+def _detect_game_element(text: str) -> GameElement | None:
+    """Detect game element from text content."""
+    return _scan_tactical_keywords(text)[1]
 
 
 def _detect_situation_type(text: str) -> SituationType | None:
     """Detect 2v1 situation type from text content."""
-    text_lower = text.lower()
-    for keyword, situation in SITUATION_KEYWORDS.items():
-        if keyword in text_lower:
-            return situation
-    return None
+    return _scan_tactical_keywords(text)[2]
 
 
 def _detect_lanes(text: str) -> list[LaneName]:
     """Detect pitch lanes mentioned in text."""
-    text_lower = text.lower()
-    lanes: list[LaneName] = []
-    for keyword, lane in LANE_KEYWORDS.items():
-        if keyword in text_lower and lane not in lanes:
-            lanes.append(lane)
-    return lanes
+    return _scan_tactical_keywords(text)[3]
 
 
 def _detect_methodology(text: str) -> str | None:
     """Detect if Peters/Schumacher or other methodology is referenced."""
-    text_lower = text.lower()
-    if any(
-        kw in text_lower
-        for kw in ("peters", "schumacher", "2v1", "2 v 1")
-    ):
-        return "Peters/Schumacher 2v1"
-    if "rondo" in text_lower:
-        return "Rondo"
-    if "positional play" in text_lower:
-        return "Positional Play"
-    return None
+    return _scan_tactical_keywords(text)[0]
 
 
 def _enrich_drill_tactical_context(drill: DrillBlock) -> DrillBlock:
@@ -112,17 +141,17 @@ def _enrich_drill_tactical_context(drill: DrillBlock) -> DrillBlock:
             " ".join(drill.progressions),
         ]
     )
+    # Stub drills with no text at all can't match a keyword or a count
+    if all_text.isspace():
+        return drill
 
-    methodology = _detect_methodology(all_text)
-    game_element = _detect_game_element(all_text)
-    situation_type = _detect_situation_type(all_text)
-    lanes = _detect_lanes(all_text)
+    methodology, game_element, situation_type, lanes = (
+        _scan_tactical_keywords(all_text)
+    )
 
     # Detect numerical advantage
     numerical = None
-    num_match = re.search(
-        r"(\d+)\s*(?:v|vs|versus)\s*(\d+)", all_text, re.IGNORECASE
-    )
+    num_match = _NUMERICAL_RE.search(all_text)
     if num_match:
         numerical = f"{num_match.group(1)}v{num_match.group(2)}"
 
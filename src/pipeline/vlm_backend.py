@@ -1,19 +1,191 @@
 """Swappable VLM backend abstraction.
 
 Currently supports Ollama (local open-source VLMs). The VLMBackend Protocol
-allows adding new backends (e.g. AWS Bedrock) when needed.
+allows adding new backends (e.g. AWS Bedrock) when needed. Backends may also
+implement an optional ``chat_followup`` method for multi-turn retries that
+reuse the already-encoded image context.
 """
 
+import asyncio
 import base64
+import json
 import logging
+import re
+import weakref
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Protocol, runtime_checkable
 
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Shared connection pool for all Ollama requests, one per event loop (created
+# lazily). Keyed weakly so a finished loop does not keep its client alive.
+_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared pooled AsyncClient, creating it on first use.
+
+    Reusing one client keeps TCP connections alive across VLM requests
+    instead of reconnecting per image. Per-request timeouts are passed at the
+    call site.
+    """
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(600.0, connect=10.0),
+            # Retries cover connection failures only (e.g. Ollama restarting)
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            ),
+        )
+        _CLIENTS[loop] = client
+    return client
+
+
+def _read_image_b64(image_path: Path) -> str:
+    return base64.b64encode(image_path.read_bytes()).decode("ascii")
+
+
+async def encode_image_b64(image_path: Path) -> str:
+    """Read and base64-encode an image in a worker thread.
+
+    Keeps multi-MB reads and encodes off the event loop so concurrent VLM
+    requests are not stalled while an image is prepared.
+    """
+    return await asyncio.to_thread(_read_image_b64, image_path)
+
+
+_IMAGE_PLACEHOLDER = "@@image-{}@@"
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def encode_chat_payload(payload: dict) -> bytes:
+    """JSON-encode an /api/chat payload, splicing base64 images in verbatim.
+
+    The base64 alphabet needs no JSON escaping, so only the small prompt
+    skeleton goes through json.dumps; the multi-MB image strings are copied
+    into the body as-is instead of being scanned for escapes.
+    """
+    images: list[str] = []
+    messages = []
+    for message in payload["messages"]:
+        if message.get("images"):
+            placeholders = []
+            for image in message["images"]:
+                placeholders.append(_IMAGE_PLACEHOLDER.format(len(images)))
+                images.append(image)
+            message = {**message, "images": placeholders}
+        messages.append(message)
+
+    body = json.dumps({**payload, "messages": messages}).encode("utf-8")
+    for i, image in enumerate(images):
+        body = body.replace(
+            b'"' + _IMAGE_PLACEHOLDER.format(i).encode("ascii") + b'"',
+            b'"' + image.encode("ascii") + b'"',
+            1,
+        )
+    return body
+
+
+# Tokens that can change the scanner's state. An escape pair is matched as
+# one token; a backslash with no following character ends the piece.
+_SCAN_TOKEN_RE = re.compile(r'\\.?|["{}]', re.DOTALL)
+
+
+class _JSONObjectScanner:
+    """Incrementally detect where the first top-level JSON object closes."""
+
+    __slots__ = ("depth", "in_string", "escaped")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        """Consume a chunk of text; True once the object is complete."""
+        pos = 0
+        if self.escaped and text:
+            # The previous piece ended in a string escape; skip its target
+            self.escaped = False
+            pos = 1
+        for token in _SCAN_TOKEN_RE.findall(text, pos):
+            if self.in_string:
+                if token == '"':
+                    self.in_string = False
+                elif token == "\\":
+                    self.escaped = True
+                continue
+            if token[0] == "\\":
+                # Outside strings a backslash escapes nothing
+                token = token[1:]
+            if token == '"':
+                self.in_string = True
+            elif token == "{":
+                self.depth += 1
+            elif token == "}" and self.depth:
+                self.depth -= 1
+                if not self.depth:
+                    return True
+        return False
+
+
+async def stream_chat(
+    client: httpx.AsyncClient,
+    url: str,
+    payload: dict,
+    timeout: float,
+) -> dict:
+    """POST an /api/chat payload as a stream and merge it into one result.
+
+    The returned dict has the non-streaming shape (``message.content`` plus
+    the final chunk's metadata). In JSON mode the stream is closed as soon as
+    the top-level object is complete: Ollama's JSON grammar lets the model
+    pad with whitespace up to num_predict, and dropping the connection stops
+    that generation server-side.
+    """
+    stop_at_object = payload.get("format") == "json"
+    scanner = _JSONObjectScanner()
+    parts: list[str] = []
+    result: dict = {}
+    async with client.stream(
+        "POST",
+        url,
+        content=encode_chat_payload({**payload, "stream": True}),
+        headers=_JSON_HEADERS,
+        timeout=timeout,
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            chunk = orjson.loads(line)
+            if "error" in chunk:
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+            piece = chunk.get("message", {}).get("content", "")
+            parts.append(piece)
+            result = chunk
+            if chunk.get("done") or (stop_at_object and scanner.feed(piece)):
+                break
+
+    result["message"] = {"role": "assistant", "content": "".join(parts)}
+    return result
+
+
+async def aclose_http_client() -> None:
+    """Close the running loop's shared AsyncClient (call on application shutdown)."""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
 
 @dataclass
 class VLMResponse:
@@ -22,6 +194,30 @@ class VLMResponse:
     content: str
     model: str = ""
     usage: dict = field(default_factory=dict)
+    # Decoded JSON object when json_mode=True and content parsed cleanly
+    parsed: dict | None = None
+
+
+def _loads_json(text: str):
+    """Parse JSON with orjson, falling back to json for what orjson rejects.
+
+    orjson refuses NaN, Infinity and integers wider than 64 bits, which the
+    standard library (and so the VLM replies seen before orjson) accepts.
+    Raises json.JSONDecodeError if neither parser accepts the text.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return json.loads(text)
+
+
+def _decode_json_object(content: str) -> dict | None:
+    """Decode a json_mode response body, or None if it is not a clean object."""
+    try:
+        value = _loads_json(content)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
 
 
 @runtime_checkable
@@ -44,10 +240,40 @@ class VLMBackend(Protocol):
 class OllamaBackend:
     """VLM backend using a local Ollama instance."""
 
-    def __init__(self, base_url: str, model: str, timeout: float = 600.0):
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        timeout: float = 600.0,
+        keep_alive: str = "30m",
+        client: httpx.AsyncClient | None = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout = timeout
+        self.keep_alive = keep_alive
+        # Caller-owned client (custom transport, proxy, ...); None uses the
+        # shared pool from get_http_client()
+        self.client = client
+
+    def _http(self) -> httpx.AsyncClient:
+        return self.client if self.client is not None else get_http_client()
+
+    async def warmup(self) -> None:
+        """Load the model and pin it resident before a batch of requests.
+
+        An empty /api/generate request loads the model without generating,
+        so parallel requests that follow don't each hit a cold start.
+        """
+        try:
+            response = await self._http().post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "keep_alive": self.keep_alive},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Ollama warmup failed for {self.model}: {e}")
 
     async def chat_completion(
         self,
@@ -58,37 +284,79 @@ class OllamaBackend:
         temperature: float = 0.0,
         json_mode: bool = False,
     ) -> VLMResponse:
-        image_bytes = image_path.read_bytes()
-        image_b64 = base64.b64encode(image_bytes).decode("utf-8")
+        return await self._chat(
+            await self._build_messages(image_path, system_prompt, user_prompt),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+        )
+
+    async def chat_followup(
+        self,
+        image_path: Path,
+        system_prompt: str,
+        user_prompt: str,
+        previous_content: str,
+        followup_prompt: str,
+        max_tokens: int = 4096,
+        temperature: float = 0.0,
+        json_mode: bool = False,
+    ) -> VLMResponse:
+        """Continue a prior exchange with a second user turn.
+
+        The conversation prefix (system prompt, image, first user prompt) is
+        sent unchanged, so Ollama can reuse its cached KV state instead of
+        re-prefilling the image tokens. The follow-up turn attaches no image.
+        """
+        messages = await self._build_messages(image_path, system_prompt, user_prompt)
+        messages.append({"role": "assistant", "content": previous_content})
+        messages.append({"role": "user", "content": followup_prompt})
+        return await self._chat(
+            messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+        )
+
+    @staticmethod
+    async def _build_messages(
+        image_path: Path, system_prompt: str, user_prompt: str,
+    ) -> list[dict]:
+        image_b64 = await encode_image_b64(image_path)
+        return [
+            {"role": "system", "content": system_prompt},
+            {
+                "role": "user",
+                "content": user_prompt,
+                "images": [image_b64],
+            },
+        ]
 
+    async def _chat(
+        self,
+        messages: list[dict],
+        max_tokens: int,
+        temperature: float,
+        json_mode: bool,
+    ) -> VLMResponse:
         # Use native Ollama /api/chat for think control
         payload: dict = {
             "model": self.model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {
-                    "role": "user",
-                    "content": user_prompt,
-                    "images": [image_b64],
-                },
-            ],
+            "messages": messages,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens,
             },
             "think": False,
-            "stream": False,
+            "stream": True,
+            "keep_alive": self.keep_alive,
         }
         if json_mode:
             payload["format"] = "json"
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/api/chat",
-                json=payload,
-            )
-            response.raise_for_status()
-            result = response.json()
+        result = await stream_chat(
+            self._http(), f"{self.base_url}/api/chat", payload, self.timeout,
+        )
 
         content = result["message"]["content"]
         usage = {}
@@ -101,20 +369,23 @@ class OllamaBackend:
             content=content,
             model=result.get("model", self.model),
             usage=usage,
+            parsed=_decode_json_object(content) if json_mode else None,
         )
 
 
 def create_vlm_backend(
     ollama_url: str,
     vlm_model: str,
+    client: httpx.AsyncClient | None = None,
 ) -> VLMBackend:
     """Create an Ollama VLM backend.
 
     Args:
         ollama_url: Ollama base URL.
         vlm_model: Model name (e.g. 'qwen3-vl:8b').
+        client: Optional caller-owned AsyncClient; defaults to the shared pool.
 
     Returns:
         VLMBackend instance.
     """
-    return OllamaBackend(base_url=ollama_url, model=vlm_model)
+    return OllamaBackend(base_url=ollama_url, model=vlm_model, client=client)
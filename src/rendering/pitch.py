@@ -1,6 +1,7 @@
 """Render soccer pitch diagrams from DrillBlock data using mplsoccer."""
 
 import io
+from collections import defaultdict
 from typing import Callable
 
 import matplotlib
@@ -158,19 +159,22 @@ def _render_zones(ax, drill: DrillBlock, pc: CoordFn) -> None:
 
 def _render_equipment(ax, drill: DrillBlock, pc: CoordFn) -> None:
     """Layer 2: Render equipment markers."""
+    # scatter takes one marker shape per call, so markers are grouped by
+    # shape and each group is drawn with per-point sizes and colors
+    groups: dict[str, tuple[list, list, list, list]] = defaultdict(
+        lambda: ([], [], [], [])
+    )
     for eq in drill.diagram.equipment:
         style = EQUIPMENT_MARKERS.get(
             eq.equipment_type,
             {"marker": "o", "color": "#9E9E9E", "size": 80},
         )
         ex, ey = pc(eq.x, eq.y)
-        ax.scatter(
-            ex, ey,
-            s=style["size"], c=style["color"],
-            marker=style["marker"],
-            edgecolors="black", linewidths=0.5,
-            zorder=2, alpha=0.9,
-        )
+        xs, ys, sizes, colors = groups[style["marker"]]
+        xs.append(ex)
+        ys.append(ey)
+        sizes.append(style["size"])
+        colors.append(style["color"])
         # For gates, draw a line between the two points
         if eq.x2 is not None and eq.y2 is not None:
             ex2, ey2 = pc(eq.x2, eq.y2)
@@ -186,6 +190,15 @@ def _render_equipment(ax, drill: DrillBlock, pc: CoordFn) -> None:
                 color="white", alpha=0.8, zorder=2.1,
             )
 
+    for marker, (xs, ys, sizes, colors) in groups.items():
+        ax.scatter(
+            xs, ys,
+            s=sizes, c=colors,
+            marker=marker,
+            edgecolors="black", linewidths=0.5,
+            zorder=2, alpha=0.9,
+        )
+
 
 def _render_goals(ax, drill: DrillBlock, pc: CoordFn) -> None:
     """Layer 2: Render goal markers at pitch edges."""
@@ -210,6 +223,8 @@ def _render_arrows(ax, drill: DrillBlock, pc: CoordFn) -> set[str]:
     Returns set of arrow type names used (for legend).
     """
     used_types: set[str] = set()
+    # Sequence badge (x, y, edge color), drawn in one scatter after the loop
+    badges: list[tuple[float, float, str]] = []
     for arrow in drill.diagram.arrows:
         style = ARROW_STYLES.get(
             arrow.arrow_type,
@@ -238,11 +253,7 @@ def _render_arrows(ax, drill: DrillBlock, pc: CoordFn) -> set[str]:
         if arrow.sequence_number is not None:
             mid_x = (sx + ex) / 2
             mid_y = (sy + ey) / 2
-            ax.scatter(
-                mid_x, mid_y, s=120, c="white",
-                edgecolors=style["color"], linewidths=1.0,
-                zorder=2.6,
-            )
+            badges.append((mid_x, mid_y, style["color"]))
             ax.text(
                 mid_x, mid_y, str(arrow.sequence_number),
                 fontsize=6, ha="center", va="center",
@@ -261,18 +272,30 @@ def _render_arrows(ax, drill: DrillBlock, pc: CoordFn) -> set[str]:
                 zorder=2.7,
             )
 
+    if badges:
+        ax.scatter(
+            [x for x, _, _ in badges], [y for _, y, _ in badges],
+            s=120, c="white",
+            edgecolors=[color for _, _, color in badges], linewidths=1.0,
+            zorder=2.6,
+        )
+
     return used_types
 
 
 def _render_balls(ax, drill: DrillBlock, pc: CoordFn) -> None:
     """Layer 3: Render ball positions as white circles."""
-    for ball in drill.diagram.balls:
-        bx, by = pc(ball.x, ball.y)
-        ax.scatter(
-            bx, by,
-            s=100, c="white", edgecolors="black",
-            linewidths=1.5, zorder=3, marker="o",
-        )
+    balls = drill.diagram.balls
+    if not balls:
+        return
+
+    points = [pc(ball.x, ball.y) for ball in balls]
+    ax.scatter(
+        [bx for bx, _ in points], [by for _, by in points],
+        s=100, c="white", edgecolors="black",
+        linewidths=1.5, zorder=3, marker="o",
+    )
+    for ball, (bx, by) in zip(balls, points):
         if ball.label:
             ax.text(
                 bx, by - 2, ball.label,
@@ -283,15 +306,20 @@ def _render_balls(ax, drill: DrillBlock, pc: CoordFn) -> None:
 
 def _render_players(ax, drill: DrillBlock, pc: CoordFn) -> None:
     """Layer 3-4: Render player positions with color-based markers."""
-    for pos in drill.diagram.player_positions:
-        color = _color_for_player(pos)
-        px, py = pc(pos.x, pos.y)
-        ax.scatter(
-            px, py,
-            s=MARKER_SIZE, c=color,
-            edgecolors="white", linewidths=1.0,
-            zorder=3,
-        )
+    positions = drill.diagram.player_positions
+    if not positions:
+        return
+
+    # One scatter call for all players; per-point colors give the same
+    # markers as drawing them one at a time
+    points = [pc(pos.x, pos.y) for pos in positions]
+    ax.scatter(
+        [px for px, _ in points], [py for _, py in points],
+        s=MARKER_SIZE, c=[_color_for_player(pos) for pos in positions],
+        edgecolors="white", linewidths=1.0,
+        zorder=3,
+    )
+    for pos, (px, py) in zip(positions, points):
         ax.annotate(
             pos.label,
             (px, py),
@@ -332,7 +360,12 @@ def _render_legend(ax, used_arrow_types: set[str]) -> None:
         )
 
 
-def render_drill_diagram(drill: DrillBlock, fmt: str = "png") -> bytes:
+def render_drill_diagram(
+    drill: DrillBlock,
+    fmt: str = "png",
+    dpi: int = 150,
+    compress_level: int | None = None,
+) -> bytes:
     """Render a pitch diagram for a drill block.
 
     Uses VerticalPitch with the correct view (full, half, penalty area)
@@ -351,6 +384,8 @@ def render_drill_diagram(drill: DrillBlock, fmt: str = "png") -> bytes:
     Args:
         drill: DrillBlock containing diagram data.
         fmt: Output format ('png' or 'pdf').
+        dpi: Raster resolution; lower values render and encode faster.
+        compress_level: zlib level for PNG output (Pillow's default if None).
 
     Returns:
         Image bytes in the requested format.
@@ -410,7 +445,9 @@ def render_drill_diagram(drill: DrillBlock, fmt: str = "png") -> bytes:
     ax.set_title(drill.name, fontsize=14, fontweight="bold", pad=10)
 
     buf = io.BytesIO()
-    fig.savefig(buf, format=fmt, bbox_inches="tight", dpi=150)
+    save_kwargs = {}
+    if fmt == "png" and compress_level is not None:
+        save_kwargs["pil_kwargs"] = {"compress_level": compress_level}
+    fig.savefig(buf, format=fmt, bbox_inches="tight", dpi=dpi, **save_kwargs)
     plt.close(fig)
-    buf.seek(0)
-    return buf.read()
+    return buf.getvalue()
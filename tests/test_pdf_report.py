@@ -1,11 +1,19 @@
 """Tests for PDF report generation."""
 
-from unittest.mock import patch
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
 from uuid import uuid4
 
 import pytest
 
-from src.rendering.pdf_report import generate_session_pdf
+import src.rendering.pdf_report as pdf_report
+from src.rendering.pdf_report import (
+    _diagram_cache,
+    _render_drill_diagram_png,
+    _render_drill_diagrams,
+    _render_uncached,
+    generate_session_pdf,
+)
 from src.schemas.session_plan import (
     DiagramInfo,
     DrillBlock,
@@ -164,3 +172,40 @@ def test_generate_pdf_special_characters_in_title(mock_render):
     plan = _make_plan(title="GK Training: Phase 1 & 2 (Advanced)")
     result = generate_session_pdf(plan)
     assert _is_pdf(result)
+
+
+@patch("src.rendering.pdf_report._render_drill_diagram_png", return_value=b"png")
+def test_render_drill_diagrams_reuses_duplicate_drills(mock_render):
+    """Identical drills are rendered once and reused by later exports."""
+    _diagram_cache.clear()
+    drills = [_make_drill("Drill A"), _make_drill("Drill B"), _make_drill("Drill A")]
+    assert _render_drill_diagrams(drills) == [b"png"] * 3
+    assert mock_render.call_count == 2
+
+    assert _render_drill_diagrams(drills[:1]) == [b"png"]
+    assert mock_render.call_count == 2
+    _diagram_cache.clear()
+
+
+@patch("src.rendering.pdf_report.os.cpu_count", return_value=4)
+@patch("src.rendering.pdf_report._render_drill_diagram_png", return_value=b"png")
+def test_render_uncached_replaces_broken_pool(mock_render, mock_cpus):
+    """A broken worker pool is discarded and the drills render in-process."""
+    pool = MagicMock()
+    pool.map.side_effect = BrokenProcessPool("worker died")
+    with patch.object(pdf_report, "_render_pool", pool):
+        drills = [_make_drill("Drill A"), _make_drill("Drill B")]
+        assert _render_uncached(drills) == [b"png", b"png"]
+        assert pdf_report._render_pool is None
+    pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+
+@patch("src.rendering.pitch.render_drill_diagram", return_value=b"png")
+def test_pdf_diagrams_use_fast_png_compression(mock_render):
+    """Only the PDF embeds trade PNG size for encode speed."""
+    drill = _make_drill()
+    assert _render_drill_diagram_png(drill) == b"png"
+    mock_render.assert_called_once_with(
+        drill, fmt="png", dpi=pdf_report._DIAGRAM_DPI,
+        compress_level=pdf_report._DIAGRAM_COMPRESS_LEVEL,
+    )
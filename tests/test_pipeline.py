@@ -1,7 +1,15 @@
 """Tests for pipeline stages."""
 
+import asyncio
+import json
+import math
+import random
 import sys
-from unittest.mock import MagicMock
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
 
 # Mock heavy dependencies that aren't installed locally (Docker-only)
 _DOCKER_ONLY_MODULES = [
@@ -21,7 +29,24 @@ for mod in _DOCKER_ONLY_MODULES:
     if mod not in sys.modules:
         sys.modules[mod] = MagicMock()
 
-from src.pipeline.describe import _extract_json_from_text, _validate_positions
+from src.pipeline.cv_preprocess import CVAnalysis
+from src.pipeline.describe import (
+    ARROW_SYSTEM_PROMPT,
+    _extract_json_from_text,
+    _validate_positions,
+    classify_diagrams,
+    classify_single_diagram,
+    extract_diagram_structures,
+)
+from src.pipeline.vlm_backend import (
+    OllamaBackend,
+    VLMResponse,
+    _JSONObjectScanner,
+    _decode_json_object,
+    aclose_http_client,
+    encode_chat_payload,
+    get_http_client,
+)
 from src.pipeline.cross_validate import cross_validate
 from src.pipeline.extract import (
     _parse_player_positions,
@@ -35,9 +60,18 @@ from src.pipeline.extract import (
     _classify_subsection,
     _is_title_card,
     _first_line_name,
+    _iter_header_matches,
     _split_into_header_sections,
     _group_drill_sections,
     _extract_drill_blocks,
+    _parse_drill_texts,
+    _parse_block,
+    _scan_metadata_fields,
+    _scan_first_groups,
+    _HEADER_RE,
+    _SETUP_META_RE,
+    _SUBSECTION_LITERALS,
+    _SUBSECTION_RE,
 )
 from src.pipeline.validate import (
     _detect_game_element,
@@ -159,6 +193,17 @@ def test_validate_positions_deduplicates():
     assert result[0]["y"] == 60.0
 
 
+def test_validate_positions_vectorized_clamp_matches_scalar():
+    """Large diagrams take the NumPy path with the same clamping rules."""
+    raw = [{"label": f"P{i}", "x": i * 5 - 50, "y": 200 - i * 5} for i in range(40)]
+    raw.append({"label": "bad", "x": "n/a", "y": 10})
+    result = _validate_positions(raw)
+    assert len(result) == 40
+    assert result[0]["x"] == 0.0 and result[0]["y"] == 100.0
+    assert result[39]["x"] == 100.0 and result[39]["y"] == 5.0
+    assert all(isinstance(p["x"], float) for p in result)
+
+
 def test_extract_json_position_payload():
     text = '{"player_positions": [{"label": "A1", "x": 30, "y": 60, "role": "attacker"}]}'
     parsed = _extract_json_from_text(text)
@@ -189,6 +234,18 @@ def test_parse_player_positions_clamped():
     assert result[1].y == 70.0
 
 
+def test_extract_json_accepts_values_orjson_rejects():
+    """NaN, Infinity and wide integers still parse, as with json.loads."""
+    parsed = _extract_json_from_text(
+        'Result: {"x": NaN, "y": Infinity, "id": 123456789012345678901234}'
+    )
+    assert parsed is not None
+    assert math.isnan(parsed["x"])
+    assert parsed["y"] == float("inf")
+    assert parsed["id"] == 123456789012345678901234
+    assert math.isnan(_decode_json_object('{"x": NaN}')["x"])
+
+
 # --- Think-tag stripping tests ---
 
 
@@ -236,6 +293,398 @@ def test_extract_json_unclosed_think_no_json_returns_none():
     assert parsed is None
 
 
+# --- Follow-up retry tests ---
+
+
+@pytest.mark.asyncio
+async def test_classify_retries_as_followup_turn():
+    """Unparseable Pass 1 output is retried as a second turn of the same chat."""
+    vlm = MagicMock()
+    vlm.chat_completion = AsyncMock(return_value=VLMResponse(content="not json"))
+    vlm.chat_followup = AsyncMock(
+        return_value=VLMResponse(content='{"is_diagram": true, "description": "2v1"}')
+    )
+    result = await classify_single_diagram(Path("img.png"), vlm=vlm)
+    assert result["description"] == "2v1"
+    vlm.chat_completion.assert_awaited_once()
+    assert vlm.chat_followup.await_args.kwargs["previous_content"] == "not json"
+
+
+@pytest.mark.asyncio
+async def test_classify_retry_without_followup_support():
+    """Backends without chat_followup fall back to a standalone retry."""
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(side_effect=[
+        VLMResponse(content="not json"),
+        VLMResponse(content='{"is_diagram": false, "description": "logo"}'),
+    ])
+    result = await classify_single_diagram(Path("img.png"), vlm=vlm)
+    assert result["is_diagram"] is False
+    assert vlm.chat_completion.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_classify_uses_backend_parsed_json():
+    """A pre-decoded json_mode response skips text parsing and retries."""
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(return_value=VLMResponse(
+        content="ignored", parsed={"is_diagram": False, "description": "cover"},
+    ))
+    result = await classify_single_diagram(Path("img.png"), vlm=vlm)
+    assert result == {"is_diagram": False, "description": "cover"}
+    vlm.chat_completion.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_classify_retries_truncated_response_with_larger_budget():
+    """Cut-off JSON is re-issued with double max_tokens, not a follow-up."""
+    vlm = MagicMock()
+    vlm.chat_completion = AsyncMock(side_effect=[
+        VLMResponse(content='{"is_diagram": true, "description": "2v1 dri'),
+        VLMResponse(content='{"is_diagram": true, "description": "2v1 drill"}'),
+    ])
+    vlm.chat_followup = AsyncMock()
+    result = await classify_single_diagram(Path("img.png"), max_tokens=1024, vlm=vlm)
+    assert result["description"] == "2v1 drill"
+    assert vlm.chat_completion.await_args.kwargs["max_tokens"] == 2048
+    vlm.chat_followup.assert_not_awaited()
+
+
+def test_encode_chat_payload_round_trips():
+    """Spliced base64 images produce the same JSON as json.dumps."""
+    payload = {
+        "model": "qwen3-vl:8b",
+        "messages": [
+            {"role": "system", "content": 'Respond with "JSON"'},
+            {"role": "user", "content": "Classify", "images": ["iVBORw0K+/==", "QUJD"]},
+        ],
+        "stream": False,
+    }
+    assert json.loads(encode_chat_payload(payload)) == payload
+
+
+def test_get_http_client_is_per_loop():
+    """Each event loop gets its own client; closing one leaves the others."""
+
+    async def use_client():
+        client = get_http_client()
+        assert get_http_client() is client
+        return client
+
+    async def close_client():
+        client = await use_client()
+        await aclose_http_client()
+        assert client.is_closed
+        assert get_http_client() is not client
+        await aclose_http_client()
+
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(use_client())
+        asyncio.run(close_client())
+        assert not first.is_closed
+        assert loop.run_until_complete(use_client()) is first
+        loop.run_until_complete(aclose_http_client())
+        assert first.is_closed
+    finally:
+        loop.close()
+
+
+@pytest.mark.asyncio
+async def test_ollama_backend_uses_injected_client(tmp_path):
+    """A caller-supplied AsyncClient carries the backend's requests."""
+    image = tmp_path / "diagram.png"
+    image.write_bytes(b"png")
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        return httpx.Response(200, json={
+            "model": "qwen3-vl:8b",
+            "message": {"content": '{"is_diagram": true}'},
+            "eval_count": 5,
+        })
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        backend = OllamaBackend("http://ollama:11434", "qwen3-vl:8b", client=client)
+        resp = await backend.chat_completion(image, "sys", "user", json_mode=True)
+
+    assert seen == ["/api/chat"]
+    assert resp.parsed == {"is_diagram": True}
+    assert resp.usage == {"eval_count": 5}
+
+
+@pytest.mark.asyncio
+async def test_ollama_backend_stops_stream_at_json_close(tmp_path):
+    """JSON-mode streams are cut once the object closes, ignoring padding."""
+    image = tmp_path / "diagram.png"
+    image.write_bytes(b"png")
+    pieces = ['{"label": "x}\\"', '{", "n"', ': {"k": 1}', "}", "\n  ", "\n"]
+    sent = []
+
+    async def body():
+        for piece in pieces:
+            sent.append(piece)
+            chunk = {"model": "qwen3-vl:8b", "message": {"content": piece}, "done": False}
+            yield (json.dumps(chunk) + "\n").encode()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=body())
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        backend = OllamaBackend("http://ollama:11434", "qwen3-vl:8b", client=client)
+        resp = await backend.chat_completion(image, "sys", "user", json_mode=True)
+
+    assert resp.parsed == {"label": 'x}"{', "n": {"k": 1}}
+    assert len(sent) == 4
+
+
+def _scan(pieces: list[str]) -> int | None:
+    """Index of the piece on which the scanner reports the object closed."""
+    scanner = _JSONObjectScanner()
+    for i, piece in enumerate(pieces):
+        if scanner.feed(piece):
+            return i
+    return None
+
+
+def test_json_scanner_ignores_braces_in_strings():
+    assert _scan(['{"a": "}{}}"', "}"]) == 1
+    assert _scan(['{"a": "{{"']) is None
+
+
+def test_json_scanner_handles_escaped_quotes():
+    assert _scan(['{"a": "x\\"}"', "}"]) == 1
+    assert _scan(['{"a": "x\\\\"}']) == 0
+
+
+def test_json_scanner_carries_escape_across_pieces():
+    """A backslash ending one piece escapes the first character of the next."""
+    assert _scan(['{"a": "x\\', '"}', '"}']) == 2
+    assert _scan(['{"a": "x\\', "", '"}', '"}']) == 3
+    assert _scan(['{"a": "x\\\\', '"}']) == 1
+
+
+def test_json_scanner_matches_decoder_for_any_chunking():
+    """The object closes on the piece holding the decoder's end position."""
+    doc = (
+        '{"label": "A\\"1}", "path": "C:\\\\{x}", '
+        '"nested": {"k": [1, {"v": "\\\\"}]}, "u": "\\u007b"}  trailing }'
+    )
+    end = json.JSONDecoder().raw_decode(doc)[1]
+    rng = random.Random(0)
+    for _ in range(500):
+        cuts = sorted(rng.sample(range(1, len(doc)), rng.randint(1, 12)))
+        bounds = [0, *cuts, len(doc)]
+        pieces = [doc[a:b] for a, b in zip(bounds, bounds[1:])]
+        expected = next(i for i, b in enumerate(bounds[1:]) if b >= end)
+        assert _scan(pieces) == expected
+
+
+# --- Result cache tests ---
+
+
+@pytest.mark.asyncio
+async def test_classify_diagrams_reuses_duplicate_and_cached_images(tmp_path):
+    """Identical images hit the VLM once; cache_dir persists across runs."""
+    for name in ("a.png", "b.png"):
+        (tmp_path / name).write_bytes(b"same-image-bytes")
+    images = {"a": tmp_path / "a.png", "b": tmp_path / "b.png"}
+    cache_dir = tmp_path / "cache"
+
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(
+        return_value=VLMResponse(content='{"is_diagram": true, "description": "2v1"}')
+    )
+    first = await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert first["a"] == first["b"]
+    assert vlm.chat_completion.await_count == 1
+
+    second = await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert second["a"]["description"] == "2v1"
+    assert vlm.chat_completion.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_classify_diagrams_without_cache_dir_does_not_cache(tmp_path):
+    """With no cache_dir, neither layer serves results: re-runs hit the VLM."""
+    (tmp_path / "a.png").write_bytes(b"memory-cache-image")
+    images = {"a": tmp_path / "a.png"}
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(
+        return_value=VLMResponse(content='{"is_diagram": false, "description": "logo"}')
+    )
+    await classify_diagrams(images, vlm=vlm)
+    again = await classify_diagrams(images, vlm=vlm)
+    assert again["a"]["description"] == "logo"
+    assert vlm.chat_completion.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_classify_diagrams_memory_cache_fronts_cache_dir(tmp_path):
+    """With a cache_dir, re-runs are served from the in-process LRU."""
+    (tmp_path / "a.png").write_bytes(b"memory-front-image")
+    images = {"a": tmp_path / "a.png"}
+    cache_dir = tmp_path / "cache"
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(
+        return_value=VLMResponse(content='{"is_diagram": false, "description": "logo"}')
+    )
+    await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    for path in cache_dir.glob("*.json"):
+        path.unlink()
+    again = await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert again["a"]["description"] == "logo"
+    assert vlm.chat_completion.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_classify_diagrams_cache_hit_is_a_deep_copy(tmp_path):
+    """Editing a returned classification does not alter the cached entry."""
+    (tmp_path / "a.png").write_bytes(b"deep-copy-image")
+    images = {"a": tmp_path / "a.png"}
+    cache_dir = tmp_path / "cache"
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(return_value=VLMResponse(content=(
+        '{"is_diagram": true, "description": "d", '
+        '"pitch_view": {"view_type": "half_pitch"}}'
+    )))
+    await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    hit = await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    hit["a"]["pitch_view"]["view_type"] = "full_pitch"
+    again = await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert again["a"]["pitch_view"] == {"view_type": "half_pitch"}
+    assert vlm.chat_completion.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_classify_diagrams_does_not_cache_fallback(tmp_path):
+    """An unparseable reply falls back heuristically and is retried next run."""
+    (tmp_path / "a.png").write_bytes(b"fallback-image")
+    images = {"a": tmp_path / "a.png"}
+    cache_dir = tmp_path / "cache"
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(return_value=VLMResponse(content="not json"))
+
+    first = await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert first["a"]["description"] == "not json"
+    calls = vlm.chat_completion.await_count
+    assert not list(cache_dir.glob("*.json"))
+
+    await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert vlm.chat_completion.await_count == 2 * calls
+
+
+@pytest.mark.asyncio
+async def test_extract_diagram_structures_does_not_cache_failed_subpass(
+    tmp_path, monkeypatch,
+):
+    """A sub-pass that cannot be parsed is returned but retried next run."""
+    (tmp_path / "a.png").write_bytes(b"partial-image")
+    images = {"a": tmp_path / "a.png"}
+    classifications = {"a": {"is_diagram": True, "description": "drill"}}
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(
+        "src.pipeline.cv_preprocess.analyze_diagram", lambda path: CVAnalysis(),
+    )
+
+    async def fake_completion(**kwargs):
+        if kwargs["system_prompt"].startswith(ARROW_SYSTEM_PROMPT):
+            return VLMResponse(content="not json")
+        return VLMResponse(content=(
+            '{"players": [], "equipment": [], "goals": [], '
+            '"pitch_view": {"view_type": "half_pitch"}}'
+        ))
+
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(side_effect=fake_completion)
+
+    first = await extract_diagram_structures(
+        images, classifications, vlm=vlm, cache_dir=cache_dir,
+    )
+    assert first["a"]["arrows"] == []
+    assert first["a"]["pitch_view"] == {"view_type": "half_pitch"}
+    calls = vlm.chat_completion.await_count
+    assert not list(cache_dir.glob("*.json"))
+
+    await extract_diagram_structures(
+        images, classifications, vlm=vlm, cache_dir=cache_dir,
+    )
+    assert vlm.chat_completion.await_count == 2 * calls
+
+
+@pytest.mark.asyncio
+async def test_classify_diagrams_skips_warmup_when_cached(tmp_path):
+    """A fully cached batch never loads the model."""
+    (tmp_path / "a.png").write_bytes(b"cached-image")
+    images = {"a": tmp_path / "a.png"}
+    cache_dir = tmp_path / "cache"
+    vlm = MagicMock(spec=["chat_completion", "warmup"])
+    vlm.chat_completion = AsyncMock(
+        return_value=VLMResponse(content='{"is_diagram": true, "description": "d"}')
+    )
+    vlm.warmup = AsyncMock()
+
+    await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert vlm.warmup.await_count == 1
+
+    await classify_diagrams(images, vlm=vlm, cache_dir=cache_dir)
+    assert vlm.warmup.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_classify_diagrams_bounds_concurrency(tmp_path):
+    """Pass 1 overlaps VLM requests up to max_concurrency, preserving order."""
+    images = {}
+    for i in range(6):
+        (tmp_path / f"{i}.png").write_bytes(f"image-{i}".encode())
+        images[f"img{i}"] = tmp_path / f"{i}.png"
+
+    active = peak = 0
+
+    async def fake_completion(**kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return VLMResponse(content='{"is_diagram": true, "description": "d"}')
+
+    vlm = MagicMock(spec=["chat_completion"])
+    vlm.chat_completion = AsyncMock(side_effect=fake_completion)
+    results = await classify_diagrams(images, vlm=vlm, max_concurrency=2)
+    assert list(results) == list(images)
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_extract_diagram_structures_skips_failed_diagram(tmp_path, monkeypatch):
+    """One failing diagram is dropped without aborting the rest of the batch."""
+    images = {}
+    for name in ("good", "bad"):
+        (tmp_path / f"{name}.png").write_bytes(f"{name}-image".encode())
+        images[name] = tmp_path / f"{name}.png"
+    classifications = {
+        key: {"is_diagram": True, "description": key} for key in images
+    }
+
+    async def fake_extract(key, image_path, classification, **kwargs):
+        if key == "bad":
+            raise RuntimeError("VLM unavailable")
+        return {"description": key, "player_positions": []}, True
+
+    monkeypatch.setattr(
+        "src.pipeline.describe._extract_single_structure", fake_extract,
+    )
+    vlm = MagicMock(spec=["chat_completion"])
+    results = await extract_diagram_structures(
+        images, classifications, vlm=vlm, cache_dir=tmp_path / "cache",
+    )
+    assert results == {"good": {"description": "good", "player_positions": []}}
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+
+
 # --- Enriched parsing helper tests ---
 
 
@@ -354,6 +803,18 @@ def test_parse_zones_clamps_coords():
     assert zones[0].y2 == 100.0
 
 
+def test_parse_equipment_vectorized_clamp_matches_scalar():
+    """Long element lists take the NumPy path with the same clamping rules."""
+    data = [{"equipment_type": "cone", "x": i * 5 - 50, "y": float("nan")} for i in range(40)]
+    data.append({"equipment_type": "gate", "x": "n/a", "y": 10})
+    data.append({"equipment_type": "gate", "x": 10, "y": 10, "x2": 140, "y2": -3})
+    equipment = _parse_equipment(data)
+    assert len(equipment) == 41
+    assert equipment[0].x == 0.0 and equipment[0].y == 100.0
+    assert equipment[0].x2 is None and equipment[0].y2 is None
+    assert equipment[-1].x2 == 100.0 and equipment[-1].y2 == 0.0
+
+
 # --- Subsection pattern matching tests ---
 
 
@@ -377,6 +838,14 @@ def test_subsection_matches_regression():
     assert _is_subsection_header("Regression(s)")
 
 
+def test_subsection_literals_agree_with_regex():
+    """The literal fast path never accepts a header the regex would reject."""
+    for literal in _SUBSECTION_LITERALS:
+        assert _SUBSECTION_RE.match(literal), literal
+    assert _is_subsection_header("COACHING POINTS:")
+    assert not _is_subsection_header("Setup.")
+
+
 def test_classify_subsection_british_spelling():
     assert _classify_subsection("Organisation") == "setup"
     assert _classify_subsection("Organisation:") == "setup"
@@ -394,6 +863,10 @@ def test_first_line_name():
     assert _first_line_name("A" * 100) == "A" * 57 + "..."
 
 
+def test_first_line_name_only_splits_on_newlines():
+    assert _first_line_name("plain words\x0c more\r\nnext") == "plain words\x0c more"
+
+
 def test_is_title_card():
     assert _is_title_card("My Session Plan", "My Session Plan")
     assert _is_title_card("ANGK - METHODOLOGY - CUTBACKS", "ANGK - METHODOLOGY - CUTBACKS FRONT POST AREA")
@@ -401,6 +874,40 @@ def test_is_title_card():
     assert not _is_title_card("", "Some Title")
 
 
+def test_scan_metadata_fields_first_match_per_field():
+    markdown = "Author:\nDifficulty: Hard\nTopic: Pressing\nLevel: Easy\nAim: Win it back"
+    fields = _scan_metadata_fields(markdown)
+    # A value may start on the next line, which still counts for its own field
+    assert fields == {
+        "author": "Difficulty: Hard",
+        "difficulty": "Hard",
+        "category": "Pressing",
+        "desired_outcome": "Win it back",
+    }
+
+
+def test_parse_block_only_splits_on_newlines():
+    items, body = _parse_block("- Pass and move\x0cto the cone\n- Receive")
+    # A form feed from PDF text does not start a new list item
+    assert items == ["Pass and move\x0cto the cone", "Receive"]
+    assert body == "Pass and move\x0cto the cone\nReceive"
+
+
+def test_scan_setup_meta_finds_area_inside_player_count_line():
+    fields = _scan_first_groups(_SETUP_META_RE, "Play 4v4 in a 20 x 30 yards grid.")
+    # The player count runs to the end of the sentence and contains the area
+    assert fields["player_count"] == "4v4 in a 20 x 30 yards grid"
+    assert fields["area_dimensions"] == "20 x 30 yards grid"
+
+
+
+def test_iter_header_matches_agrees_with_finditer():
+    markdown = "## First\ntext ## not a header\n##\n#### Deep\n###  Sub \n  ## Indented\n## Last"
+    expected = [m.span() for m in _HEADER_RE.finditer(markdown)]
+    assert [m.span() for m in _iter_header_matches(markdown)] == expected
+    assert len(expected) == 3
+
+
 # --- Drill count tests (representative markdown for each session plan format) ---
 
 
@@ -508,6 +1015,21 @@ def test_nielsen_drill_count():
     assert len(drills) == 3
 
 
+def test_extract_drill_blocks_reuses_parsed_text():
+    """Re-extracting a document hits the parse cache but builds fresh models."""
+    _parse_drill_texts.cache_clear()
+    with patch(
+        "src.pipeline.extract._split_into_header_sections",
+        wraps=_split_into_header_sections,
+    ) as split:
+        first = _extract_drill_blocks(_NIELSEN_MARKDOWN, {}, {})
+        second = _extract_drill_blocks(_NIELSEN_MARKDOWN, {}, {})
+    assert split.call_count == 1
+    assert [d.name for d in first] == [d.name for d in second]
+    first[0].sequence.append("extra step")
+    assert "extra step" not in second[0].sequence
+
+
 # --- Cross-validation tests ---
 
 
@@ -0,0 +1,188 @@
+"""Tests for session plan storage with a mocked database session."""
+
+import json
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+# Mock Docker-only modules before importing the pipeline package
+_DOCKER_ONLY_MODULES = [
+    "docling",
+    "docling.document_converter",
+    "docling.datamodel",
+    "docling.datamodel.base_models",
+    "docling.datamodel.pipeline_options",
+    "docling_core",
+    "docling_core.types",
+    "docling_core.types.doc",
+]
+for mod in _DOCKER_ONLY_MODULES:
+    if mod not in sys.modules:
+        sys.modules[mod] = MagicMock()
+
+from src.pipeline import store
+from src.pipeline.store import replace_session_plan, store_session_plan
+from src.schemas.session_plan import (
+    DrillBlock,
+    DrillSetup,
+    SessionMetadata,
+    SessionPlan,
+    Source,
+)
+from src.schemas.tactical import (
+    GameElement,
+    LaneName,
+    SituationType,
+    TacticalContext,
+)
+
+
+@pytest.fixture(autouse=True)
+def _distinct_statements(monkeypatch):
+    """Give each SQL constant its own identity, even with sqlalchemy mocked."""
+    for name in (
+        "_DRILL_EXISTS_SQL", "_INSERT_DRILL_SQL", "_INSERT_TACTICAL_SQL",
+        "_UPSERT_PLAN_SQL", "_DELETE_DRILLS_SQL", "_UPDATE_PLAN_SQL",
+    ):
+        monkeypatch.setattr(store, name, object())
+
+
+def _make_plan() -> SessionPlan:
+    """A plan with two drills, one of which has a tactical context."""
+    tc = TacticalContext(
+        methodology="Peters/Schumacher 2v1",
+        game_element=GameElement.COUNTER_ATTACK,
+        lanes=[LaneName.CENTRAL_CORRIDOR],
+        situation_type=SituationType.FRONTAL,
+    )
+    drills = [
+        DrillBlock(
+            name="2v1 Counter",
+            setup=DrillSetup(description="Cones", equipment=["cones"]),
+            sequence=["Pass", "Finish"],
+            tactical_context=tc,
+        ),
+        DrillBlock(name="Cool down"),
+    ]
+    return SessionPlan(
+        metadata=SessionMetadata(title="Test Session"),
+        drills=drills,
+        source=Source(filename="test.pdf", page_count=2),
+    )
+
+
+def _make_db(driver: str = "asyncpg", drills_exist: bool = False):
+    """Build a mocked AsyncSession plus the raw asyncpg connection behind it."""
+    copy_conn = MagicMock()
+    copy_conn.copy_records_to_table = AsyncMock()
+
+    conn = MagicMock()
+    conn.dialect.driver = driver
+    conn.get_raw_connection = AsyncMock(
+        return_value=MagicMock(driver_connection=copy_conn)
+    )
+
+    async def execute(statement, params=None):
+        result = MagicMock()
+        if statement is store._DRILL_EXISTS_SQL:
+            result.first.return_value = (1,) if drills_exist else None
+        return result
+
+    db = MagicMock()
+    db.connection = AsyncMock(return_value=conn)
+    db.execute = AsyncMock(side_effect=execute)
+    db.commit = AsyncMock()
+    return db, copy_conn
+
+
+def _executed(db, statement) -> list:
+    """Parameters of every db.execute call made with the given statement."""
+    return [c.args[1] for c in db.execute.await_args_list if c.args[0] is statement]
+
+
+@pytest.mark.asyncio
+async def test_store_session_plan_copies_fresh_drills():
+    """New drills are streamed with COPY instead of INSERT statements."""
+    plan = _make_plan()
+    db, copy_conn = _make_db()
+
+    assert await store_session_plan(plan, db) == plan.id
+
+    exists = _executed(db, store._DRILL_EXISTS_SQL)
+    assert exists == [{"ids": [str(d.id) for d in plan.drills]}]
+    assert not _executed(db, store._INSERT_DRILL_SQL)
+    assert not _executed(db, store._INSERT_TACTICAL_SQL)
+
+    drill_call, tactical_call = copy_conn.copy_records_to_table.await_args_list
+    assert drill_call.args == ("drill_blocks",)
+    assert drill_call.kwargs["columns"] == store._DRILL_COLUMNS
+    records = drill_call.kwargs["records"]
+    assert [r[0] for r in records] == [str(d.id) for d in plan.drills]
+    assert all(r[1] == str(plan.id) for r in records)
+
+    assert tactical_call.args == ("tactical_contexts",)
+    assert tactical_call.kwargs["records"] == [(
+        str(plan.drills[0].id), "Peters/Schumacher 2v1",
+        GameElement.COUNTER_ATTACK.value,
+        [LaneName.CENTRAL_CORRIDOR.value], SituationType.FRONTAL.value,
+    )]
+    db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_store_session_plan_upserts_existing_drills():
+    """If any drill already exists, each table gets one executemany upsert."""
+    plan = _make_plan()
+    db, copy_conn = _make_db(drills_exist=True)
+
+    await store_session_plan(plan, db)
+
+    copy_conn.copy_records_to_table.assert_not_awaited()
+    (drill_params,) = _executed(db, store._INSERT_DRILL_SQL)
+    assert [p["id"] for p in drill_params] == [str(d.id) for d in plan.drills]
+    (tc_params,) = _executed(db, store._INSERT_TACTICAL_SQL)
+    assert [p["drill_block_id"] for p in tc_params] == [str(plan.drills[0].id)]
+
+
+@pytest.mark.asyncio
+async def test_store_session_plan_skips_copy_for_other_drivers():
+    """Non-asyncpg drivers use executemany without checking for existing drills."""
+    plan = _make_plan()
+    db, copy_conn = _make_db(driver="psycopg")
+
+    await store_session_plan(plan, db)
+
+    assert not _executed(db, store._DRILL_EXISTS_SQL)
+    copy_conn.copy_records_to_table.assert_not_awaited()
+    (drill_params,) = _executed(db, store._INSERT_DRILL_SQL)
+    assert len(drill_params) == 2
+
+
+@pytest.mark.asyncio
+async def test_drill_raw_json_reuses_plan_dump():
+    """Per-drill raw_json matches the drill's entry in the plan's raw_json."""
+    plan = _make_plan()
+    db, _ = _make_db(drills_exist=True)
+
+    await store_session_plan(plan, db)
+
+    (plan_params,) = _executed(db, store._UPSERT_PLAN_SQL)
+    plan_drills = json.loads(plan_params["raw_json"])["drills"]
+    (drill_params,) = _executed(db, store._INSERT_DRILL_SQL)
+    assert [json.loads(p["raw_json"]) for p in drill_params] == plan_drills
+    assert plan_drills == plan.model_dump(mode="json")["drills"]
+
+
+@pytest.mark.asyncio
+async def test_replace_session_plan_deletes_then_copies():
+    """Replacing a plan deletes its drills, so the new ones are COPY'd."""
+    plan = _make_plan()
+    db, copy_conn = _make_db()
+
+    await replace_session_plan(plan.id, plan, db)
+
+    assert _executed(db, store._DELETE_DRILLS_SQL) == [{"plan_id": str(plan.id)}]
+    assert _executed(db, store._UPDATE_PLAN_SQL)[0]["title"] == "Test Session"
+    assert copy_conn.copy_records_to_table.await_count == 2
+    db.commit.assert_awaited_once()